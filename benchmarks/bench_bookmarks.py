@@ -0,0 +1,148 @@
+#!/usr/bin/env -S uv run --quiet
+# /// script
+# dependencies = [
+#   "orjson",
+# ]
+# requires-python = ">=3.12"
+# ///
+"""Benchmark Bookmarks parsing: JSON backends and the folder-tree walk.
+
+Writes synthetic Bookmarks files (a large shallow tree and a deeply nested
+one, like repeated imports produce) and times parsing with the standard
+library json and with orjson (when installed), the recursive generator walk
+the extractor used to have against the iterative `walk_bookmarks`, and
+`extract_bookmarks` end to end. The walks' rows are checked to match.
+
+    uv run benchmarks/bench_bookmarks.py --bookmarks 200000 --deep 150
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import onetab_extractor as ote  # noqa: E402
+from synthetic import bookmarks_json  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def recursive_walk(roots: dict, profile_name: str):
+    """The previous recursive walker, kept here as the baseline."""
+    def walk(node, folder):
+        if node.get('type') == 'url':
+            yield ote.Row(profile_name, 'Bookmark', folder,
+                          ote.chrome_time_to_micros(int(node.get('date_added', 0))), '',
+                          node.get('name', 'No Title'), node.get('url', ''))
+        elif node.get('type') == 'folder':
+            child_folder = sys.intern(f"{folder}/{node['name']}" if folder else node['name'])
+            for child in node.get('children', []):
+                yield from walk(child, child_folder)
+
+    for root_key, root_node in roots.items():
+        if isinstance(root_node, dict):
+            yield from walk(root_node, ote.BOOKMARK_ROOT_LABELS.get(root_key, root_key))
+
+
+def nested_bookmarks(depth: int, per_folder: int) -> dict:
+    """A Bookmarks file whose bar is a chain of `depth` folders."""
+    tree = bookmarks_json(per_folder, 1)
+    node = tree['roots']['bookmark_bar']
+    for level in range(depth):
+        child = {'type': 'folder', 'name': f'Imported {level}', 'children': [
+            {'type': 'url', 'name': f'Bookmark {level}.{i}', 'url': f'https://example.com/{i}',
+             'date_added': '13300000000000000'} for i in range(per_folder)]}
+        node['children'].append(child)
+        node = child
+    return tree
+
+
+def best_of(repeat: int, fn) -> tuple[float, object]:
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def bench_file(path: Path, repeat: int) -> dict:
+    data = path.read_bytes()
+    results = {'bytes': len(data)}
+    parsers = {'json': json.loads}
+    if orjson is not None:
+        parsers['orjson'] = orjson.loads
+    for name, loads in parsers.items():
+        results[f'parse_{name}'] = round(best_of(repeat, lambda: loads(data))[0], 4)
+
+    roots = json.loads(data)['roots']
+    walks = {}
+    for name, walk in (('recursive', recursive_walk), ('iterative', ote.walk_bookmarks)):
+        try:
+            seconds, rows = best_of(repeat, lambda: list(walk(roots, 'Default')))
+        except RecursionError:
+            results[f'walk_{name}'] = 'RecursionError'
+            continue
+        results[f'walk_{name}'] = round(seconds, 4)
+        walks[name] = rows
+    results['rows'] = len(walks['iterative'])
+    if 'recursive' in walks:
+        results['walks_match'] = walks['recursive'] == walks['iterative']
+
+    results['extract_bookmarks'] = round(best_of(
+        repeat, lambda: list(ote.extract_bookmarks(path.parent, 'Default')))[0], 4)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bookmarks', type=int, default=100_000, help='URLs in the large tree')
+    parser.add_argument('--bookmark-depth', type=int, default=6, help='Folder depth of the large tree')
+    parser.add_argument('--deep', type=int, default=150,
+                        help='Folder depth of the nested tree (Chrome reads up to ~200 levels)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best of)')
+    parser.add_argument('-o', '--output', type=str, help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    ote.console.quiet = True
+    workdir = Path(tempfile.mkdtemp(prefix='onetab_bench_'))
+    try:
+        trees = {
+            'large': bookmarks_json(args.bookmarks, args.bookmark_depth),
+            'deep': nested_bookmarks(args.deep, 5),
+        }
+        results = {}
+        for name, tree in trees.items():
+            profile_dir = workdir / name
+            profile_dir.mkdir()
+            (profile_dir / 'Bookmarks').write_text(json.dumps(tree, indent=3), encoding='utf-8')
+            results[name] = bench_file(profile_dir / 'Bookmarks', args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = json.dumps({
+        'benchmark': 'bookmarks',
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'orjson': orjson.__version__ if orjson is not None else None,
+        'data': {'bookmarks': args.bookmarks, 'bookmark_depth': args.bookmark_depth,
+                 'deep': args.deep},
+        'trees': results,
+    }, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env -S uv run --quiet
+# /// script
+# dependencies = [
+#   "plyvel-ci",
+# ]
+# requires-python = ">=3.12"
+# ///
+"""Benchmark and check the export filters (--since, --until, --domain).
+
+Times every extractor unfiltered and with a date range and a domain pushed
+down, checking each filtered unit against `RowFilter.apply` on its unfiltered
+rows. Then, under each `--tz`, builds a profile whose History, Bookmarks and
+OneTab (IndexedDB and legacy) entries are 1 to 30 hours old and checks that
+`--since 12h` / `--until 12h` split them at 12 hours for every source, whatever
+clock the source exports its dates in. Exits non-zero if a check fails.
+
+    uv run benchmarks/bench_filters.py --profiles 2 --history 100000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import onetab_extractor as ote  # noqa: E402
+from synthetic import (CHROME_EPOCH_OFFSET_US, ONETAB_EXTENSION_ID, make_user_data,  # noqa: E402
+                       write_history, write_onetab_idb)
+
+AGES_HOURS = (1, 6, 11, 13, 16, 20, 30)
+SPLIT = '12h'
+
+
+def extract(unit: tuple, row_filter: ote.RowFilter | None) -> list:
+    source, profile_dir, profile_name, tmp_base, keep_tmp, kwargs = unit
+    kwargs = {**kwargs, 'row_filter': row_filter} if row_filter else kwargs
+    return list(ote.extract_unit((source, profile_dir, profile_name, tmp_base, keep_tmp, kwargs)))
+
+
+def bench_filters(chrome_dir: Path, tmp_base: Path, filters: dict) -> tuple[dict, bool]:
+    units = ote.build_units(ote.find_profiles(chrome_dir), list(ote.SOURCES), tmp_base, False)
+    results, ok = {}, True
+    full = {}
+    start = time.perf_counter()
+    for i, unit in enumerate(units):
+        full[i] = extract(unit, None)
+    results['full'] = {'seconds': round(time.perf_counter() - start, 4),
+                       'rows': sum(map(len, full.values()))}
+    for name, row_filter in filters.items():
+        start = time.perf_counter()
+        rows = {i: extract(unit, row_filter) for i, unit in enumerate(units)}
+        seconds = time.perf_counter() - start
+        match = all(rows[i] == list(row_filter.on_clock(
+            'utc' if unit[0] != 'onetab' else 'local').apply(full[i]))
+            for i, unit in enumerate(units))
+        ok &= match
+        results[name] = {'seconds': round(seconds, 4), 'rows': sum(map(len, rows.values())),
+                         'matches_apply': match}
+    return results, ok
+
+
+def write_aged_profile(profile_dir: Path, now: int) -> None:
+    """One profile with a History URL, bookmark and OneTab tab per entry of AGES_HOURS."""
+    profile_dir.mkdir(parents=True)
+    (profile_dir / 'Preferences').write_text(json.dumps({'profile': {'name': 'Aged'}}))
+    chrome = [(now - hours * 3600) * 1_000_000 + CHROME_EPOCH_OFFSET_US for hours in AGES_HOURS]
+    ms = [(now - hours * 3600) * 1000 for hours in AGES_HOURS]
+
+    write_history(profile_dir / 'History', 0)
+    conn = sqlite3.connect(profile_dir / 'History')
+    conn.executemany('INSERT INTO urls(url, title, last_visit_time) VALUES (?, ?, ?)',
+                     [(f'https://history.example/{h}h', f'{h}h', t)
+                      for h, t in zip(AGES_HOURS, chrome)])
+    conn.commit()
+    conn.close()
+
+    (profile_dir / 'Bookmarks').write_text(json.dumps({'version': 1, 'roots': {'bookmark_bar': {
+        'type': 'folder', 'name': 'Bookmarks bar', 'children': [
+            {'type': 'url', 'name': f'{h}h', 'url': f'https://bookmark.example/{h}h',
+             'date_added': str(t)} for h, t in zip(AGES_HOURS, chrome)]}}}))
+
+    idb = profile_dir / 'IndexedDB' / f'chrome-extension_{ONETAB_EXTENSION_ID}_0.indexeddb.leveldb'
+    idb.parent.mkdir(parents=True)
+    group = {'id': 'g', 'type': 'group', 'label': 'Aged', 'createDate': ms[0]}
+    write_onetab_idb(idb, 0, records=[group] + [
+        {'id': f't{h}', 'type': 'tab', 'parentIds': ['g'], 'title': f'{h}h',
+         'url': f'https://onetab.example/{h}h', 'createDate': t} for h, t in zip(AGES_HOURS, ms)])
+
+
+def write_aged_legacy(profile_dir: Path, now: int) -> None:
+    """A profile with one legacy OneTab group per entry of AGES_HOURS."""
+    import plyvel
+    profile_dir.mkdir(parents=True)
+    path = profile_dir / 'Local Extension Settings' / ONETAB_EXTENSION_ID
+    path.parent.mkdir(parents=True)
+    groups = [{'id': f'g{h}', 'label': f'{h}h', 'createDate': (now - h * 3600) * 1000,
+               'tabsMeta': [{'title': f'{h}h', 'url': f'https://legacy.example/{h}h'}]}
+              for h in AGES_HOURS]
+    db = plyvel.DB(str(path), create_if_missing=True)
+    db.put(b'state', json.dumps(json.dumps({'tabGroups': groups})).encode())
+    db.close()
+
+
+def check_ages(workdir: Path, tz: str) -> tuple[dict, bool]:
+    """Hours of age each source keeps for --since/--until SPLIT under timezone `tz`."""
+    os.environ['TZ'] = tz
+    time.tzset()
+    now = int(time.time())
+    write_aged_profile(workdir / 'Default', now)
+    write_aged_legacy(workdir / 'Legacy', now)
+    units = ote.build_units([(workdir / 'Default', 'Default')], list(ote.SOURCES), workdir, False)
+    units += ote.build_units([(workdir / 'Legacy', 'Legacy')], ['onetab'], workdir, False)
+    split = int(SPLIT[:-1])
+    expected = {'since': [h for h in AGES_HOURS if h < split],
+                'until': [h for h in AGES_HOURS if h > split]}
+    results, ok = {}, True
+    for bound in ('since', 'until'):
+        row_filter = ote.RowFilter(**{bound: ote.parse_when(SPLIT)})
+        for unit in units:
+            kept = sorted(int(row.Title[:-1]) for row in extract(unit, row_filter))
+            results[f'{unit[2]}/{unit[0]}/{bound}'] = kept
+            ok &= kept == expected[bound]
+    return results, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=2, help='Synthetic Chrome profiles')
+    parser.add_argument('--history', type=int, default=50_000, help='History URLs per profile')
+    parser.add_argument('--onetab-tabs', type=int, default=5000, help='OneTab tabs per profile')
+    parser.add_argument('--tz', action='append',
+                        help='Timezones for the age check (default: UTC, America/Los_Angeles, '
+                             'Asia/Tokyo)')
+    parser.add_argument('-o', '--output', type=str, help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    ote.console.quiet = True
+    workdir = Path(tempfile.mkdtemp(prefix='onetab_bench_'))
+    try:
+        chrome_dir = workdir / 'User Data'
+        make_user_data(chrome_dir, args.profiles, history=args.history,
+                       onetab_tabs=args.onetab_tabs)
+        timings, ok = bench_filters(chrome_dir, workdir, {
+            'month': ote.RowFilter(ote.parse_when('2026-12-01'), ote.parse_when('2027-01-01')),
+            'domain': ote.RowFilter(domains=['site7.example']),
+        })
+        ages = {}
+        for tz in args.tz or ['UTC', 'America/Los_Angeles', 'Asia/Tokyo']:
+            tz_dir = workdir / tz.replace('/', '_')
+            ages[tz], tz_ok = check_ages(tz_dir, tz)
+            ok &= tz_ok
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = json.dumps({
+        'benchmark': 'filters',
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'data': {'profiles': args.profiles, 'history': args.history,
+                 'onetab_tabs': args.onetab_tabs},
+        'filters': timings,
+        'ages_kept': {'split': SPLIT, 'hours': list(AGES_HOURS), 'timezones': ages},
+        'ok': ok,
+    }, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
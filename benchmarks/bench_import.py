@@ -0,0 +1,113 @@
+#!/usr/bin/env -S uv run --quiet
+# /// script
+# dependencies = [
+#   "plyvel-ci",
+#   "rich",
+#   "python-dotenv",
+# ]
+# requires-python = ">=3.12"
+# ///
+"""Benchmark start-up latency of the extractor in fresh interpreters.
+
+Times bare Python, `import onetab_extractor`, `--help` (as a module with
+cached bytecode, and as a script, which Python recompiles every run) and two
+small quiet exports on synthetic data, one without OneTab. A `-X importtime`
+run of each scenario records how many modules it loads and which of the heavy
+optional ones (plyvel, rich, dotenv, ...) it pulls in.
+
+    uv run benchmarks/bench_import.py --repeat 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+
+from synthetic import make_user_data  # noqa: E402
+
+HEAVY_MODULES = ('plyvel', 'rich', 'dotenv', 'concurrent.futures', 'cProfile', 'pyarrow',
+                 'sqlite3', 'csv')
+
+
+def scenarios(chrome_dir: Path, out_dir: Path) -> dict[str, list[str]]:
+    export = ['-m', 'onetab_extractor', '--chrome-dir', str(chrome_dir), '-d', str(out_dir),
+              '--quiet', '--no-cache']
+    return {
+        'python': ['-c', 'pass'],
+        'import': ['-c', 'import onetab_extractor'],
+        'help': ['-m', 'onetab_extractor', '--help'],
+        'help_as_script': [str(REPO / 'onetab_extractor.py'), '--help'],
+        'export_no_onetab': [*export, '--no-onetab', '-o', 'no_onetab.csv'],
+        'export': [*export, '-o', 'all.csv'],
+    }
+
+
+def run(argv: list[str], env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *argv], cwd=REPO, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def imported_modules(argv: list[str], env: dict) -> list[str]:
+    """Names of the modules one run imports, from `-X importtime`."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *argv], cwd=REPO, env=env,
+                            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            text=True)
+    return [line.rsplit('|', 1)[1].strip() for line in result.stderr.splitlines()
+            if line.startswith('import time:') and not line.endswith('imported package')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per scenario')
+    parser.add_argument('-o', '--output', type=str, help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    # Cached bytecode, as an installed copy would have.
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(REPO), env.get('PYTHONPATH')]))
+
+    workdir = Path(tempfile.mkdtemp(prefix='onetab_bench_'))
+    try:
+        chrome_dir = workdir / 'User Data'
+        make_user_data(chrome_dir, profiles=1, bookmarks=200, history=1000, onetab_tabs=100,
+                       onetab_format='idb')
+        results = {}
+        for name, argv in scenarios(chrome_dir, workdir).items():
+            run(argv, env)      # warm the bytecode and page caches
+            seconds = [run(argv, env) for _ in range(args.repeat)]
+            modules = imported_modules(argv, env)
+            results[name] = {
+                'best_seconds': round(min(seconds), 4),
+                'median_seconds': round(statistics.median(seconds), 4),
+                'modules': len(modules),
+                'heavy_modules': [m for m in HEAVY_MODULES if m in modules],
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = json.dumps({
+        'benchmark': 'import',
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'repeat': args.repeat,
+        'scenarios': results,
+    }, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
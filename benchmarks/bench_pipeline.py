@@ -0,0 +1,163 @@
+#!/usr/bin/env -S uv run --quiet
+# /// script
+# dependencies = [
+#   "plyvel-ci",
+#   "rich",
+#   "python-dotenv",
+# ]
+# requires-python = ">=3.12"
+# ///
+"""Benchmark every stage of the export on a synthetic Chrome user-data directory.
+
+Generates profiles with Bookmarks, History and OneTab (legacy and IndexedDB)
+data, then times `find_profiles`, each `extract_*`, the merge sort, minute
+rounding, dedup and the CSV write one stage at a time, followed by the same
+pipeline streamed end to end as `main()` runs it. Reports JSON with seconds,
+rows per second and peak RSS, so results can be compared between releases.
+
+    uv run benchmarks/bench_pipeline.py --profiles 4 --history 100000
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import onetab_extractor as ote  # noqa: E402
+from synthetic import make_user_data  # noqa: E402
+
+try:
+    import resource
+except ImportError:         # Windows
+    resource = None
+
+EXTRACTORS = {
+    'extract_bookmarks': lambda d, name, tmp: ote.extract_bookmarks(d, name),
+    'extract_history': lambda d, name, tmp: ote.extract_history(d, name, tmp, False),
+    'extract_onetab': lambda d, name, tmp: ote.extract_onetab(d, name, tmp, False),
+}
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process so far (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_stages(chrome_dir: Path, tmp_base: Path, out_dir: Path) -> dict:
+    """Run the pipeline one materialized stage at a time; return per-stage results."""
+    stages = {}
+
+    def stage(name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        seconds = time.perf_counter() - start
+        rows = result if isinstance(result, int) else len(result)
+        stages[name] = {'seconds': seconds, 'rows': rows, 'peak_rss': peak_rss_bytes()}
+        return result
+
+    profiles = stage('find_profiles', ote.find_profiles, chrome_dir)
+    runs = []
+    for name, extract in EXTRACTORS.items():
+        source = name.removeprefix('extract_')
+        rows = stage(name, lambda: [list(extract(d, p, tmp_base)) for d, p in profiles])
+        runs.extend((source, unit_rows) for unit_rows in rows)
+        stages[name]['rows'] = sum(map(len, rows))
+
+    merged = stage('sort', lambda: list(ote.merge_runs(
+        [ote.sorted_run(source, rows) for source, rows in runs])))
+    rounded = stage('round_dates', lambda: list(ote.round_dates(merged)))
+    deduped = stage('dedupe', lambda: list(ote.dedupe_rows(rounded)))
+    stage('write_csv', ote.write_csv, deduped, out_dir / 'stages.csv')
+    return stages
+
+
+def run_streamed(chrome_dir: Path, tmp_base: Path, out_dir: Path, jobs: int) -> dict:
+    """Run the whole export streamed, as main() does."""
+    start = time.perf_counter()
+    profiles = ote.find_profiles(chrome_dir)
+    units = ote.build_units(profiles, ['bookmarks', 'history', 'onetab'], tmp_base, False)
+    spill_dir = Path(tempfile.mkdtemp(prefix='tmp_runs_', dir=tmp_base)) if jobs > 1 else None
+    try:
+        runs = ote.bounded_runs(ote.open_runs(units, jobs, spill_dir, [0] * len(units)),
+                                spill_dir)
+        rows = ote.dedupe_rows(ote.round_dates(ote.merge_runs(runs)))
+        count = ote.write_csv(rows, out_dir / 'streamed.csv')
+    finally:
+        if spill_dir is not None:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    return {'seconds': time.perf_counter() - start, 'rows': count, 'jobs': jobs,
+            'peak_rss': peak_rss_bytes()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=3, help='Synthetic Chrome profiles')
+    parser.add_argument('--bookmarks', type=int, default=1000, help='Bookmarks per profile')
+    parser.add_argument('--bookmark-depth', type=int, default=4, help='Bookmark folder depth')
+    parser.add_argument('--history', type=int, default=20_000, help='History URLs per profile')
+    parser.add_argument('--onetab-tabs', type=int, default=2000, help='OneTab tabs per profile')
+    parser.add_argument('--onetab-format', choices=['mixed', 'idb', 'legacy'], default='mixed',
+                        help='OneTab storage per profile (mixed alternates)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Workers for the streamed run')
+    parser.add_argument('--repeat', type=int, default=1, help='Timing repetitions (best of)')
+    parser.add_argument('--workdir', type=str, help='Generate data here and keep it')
+    parser.add_argument('-o', '--output', type=str, help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    ote.console.quiet = True
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix='onetab_bench_'))
+    chrome_dir = workdir / 'User Data'
+    try:
+        start = time.perf_counter()
+        sizes = make_user_data(chrome_dir, args.profiles, args.bookmarks, args.bookmark_depth,
+                               args.history, args.onetab_tabs, args.onetab_format)
+        generate_seconds = time.perf_counter() - start
+
+        best_stages, best_streamed = None, None
+        for _ in range(args.repeat):
+            stages = run_stages(chrome_dir, workdir, workdir)
+            if best_stages is None:
+                best_stages = stages
+            else:
+                for name, result in stages.items():
+                    if result['seconds'] < best_stages[name]['seconds']:
+                        best_stages[name] = result
+            streamed = run_streamed(chrome_dir, workdir, workdir, args.jobs)
+            if best_streamed is None or streamed['seconds'] < best_streamed['seconds']:
+                best_streamed = streamed
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    for result in (*best_stages.values(), best_streamed):
+        result['rows_per_s'] = round(result['rows'] / result['seconds']) if result['seconds'] else None
+        result['seconds'] = round(result['seconds'], 4)
+
+    report = json.dumps({
+        'benchmark': 'pipeline',
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'data': {**sizes, 'bookmark_depth': args.bookmark_depth,
+                 'onetab_format': args.onetab_format,
+                 'generate_seconds': round(generate_seconds, 3)},
+        'stages': best_stages,
+        'total_stage_seconds': round(sum(r['seconds'] for r in best_stages.values()), 4),
+        'streamed': best_streamed,
+        'peak_rss': peak_rss_bytes(),
+    }, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env -S uv run --quiet
+# /// script
+# dependencies = [
+#   "plyvel-ci",
+#   "rich",
+#   "python-dotenv",
+# ]
+# requires-python = ">=3.12"
+# ///
+"""Benchmark the V8 decoders on synthetic OneTab IndexedDB payloads.
+
+Compares the original recursive decoder (`decode_v8_reference`, kept here) with the
+iterative decoder (`_decode_v8`) and the selective group/tab decode used by
+`extract_onetab_idb`, after checking that both decoders agree on every payload.
+
+    uv run benchmarks/bench_v8.py --tabs 100000
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import onetab_extractor as ote  # noqa: E402
+from synthetic import onetab_payloads  # noqa: E402
+
+
+def read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result, shift = 0, 0
+    while pos < len(data):
+        b = data[pos]; pos += 1
+        result |= (b & 0x7F) << shift
+        if not (b & 0x80):
+            return result, pos
+        shift += 7
+    return result, pos
+
+
+def decode_v8_reference(data: bytes, pos: int = 0) -> tuple[any, int]:
+    """The module's original recursive V8 decoder: the baseline `_decode_v8` must match."""
+    if pos >= len(data):
+        return None, pos
+    tag = data[pos]; pos += 1
+
+    if tag == 0xFF:                         # version wrapper
+        _, pos = read_varint(data, pos)
+        return decode_v8_reference(data, pos)
+    if tag in (0x00, 0x3F):                 # padding / verify-count
+        if tag == 0x3F: _, pos = read_varint(data, pos)
+        return decode_v8_reference(data, pos)
+    if tag in (0x5F, 0x30): return None, pos   # undefined / null
+    if tag == 0x54: return True, pos           # true
+    if tag == 0x46: return False, pos          # false
+    if tag == 0x49:                            # int32 zigzag
+        n, pos = read_varint(data, pos)
+        return (n >> 1) ^ -(n & 1), pos
+    if tag == 0x55:                            # uint32
+        n, pos = read_varint(data, pos)
+        return n, pos
+    if tag in (0x4E, 0x44):                    # double / date
+        return struct.unpack_from('<d', data, pos)[0], pos + 8
+    if tag == 0x22:                            # one-byte string
+        n, pos = read_varint(data, pos)
+        return data[pos:pos + n].decode('latin-1', errors='replace'), pos + n
+    if tag == 0x53:                            # utf-8 string
+        n, pos = read_varint(data, pos)
+        return data[pos:pos + n].decode('utf-8', errors='replace'), pos + n
+    if tag == 0x63:                            # two-byte string
+        n, pos = read_varint(data, pos)
+        return data[pos:pos + n * 2].decode('utf-16-le', errors='replace'), pos + n * 2
+    if tag == 0x5E:                            # object reference (skip)
+        _, pos = read_varint(data, pos)
+        return None, pos
+    if tag == 0x6F:                            # JS object
+        obj = {}
+        while pos < len(data):
+            if data[pos] == 0x7B:              # end '{'
+                pos += 1; _, pos = read_varint(data, pos); break
+            k, pos = decode_v8_reference(data, pos)
+            v, pos = decode_v8_reference(data, pos)
+            if isinstance(k, str):
+                obj[k] = v
+        return obj, pos
+    if tag == 0x41:                            # dense array
+        n, pos = read_varint(data, pos)
+        arr = []
+        for _ in range(n):
+            v, pos = decode_v8_reference(data, pos)
+            arr.append(v)
+        if pos < len(data) and data[pos] == 0x24:  # end '$'
+            pos += 1
+            _, pos = read_varint(data, pos)
+            _, pos = read_varint(data, pos)
+        return arr, pos
+    if tag == 0x61:                            # sparse array
+        length, pos = read_varint(data, pos)
+        arr = []
+        while pos < len(data):
+            if data[pos] == 0x40:              # end '@'
+                pos += 1
+                _, pos = read_varint(data, pos)
+                _, pos = read_varint(data, pos)
+                break
+            k, pos = decode_v8_reference(data, pos)
+            v, pos = decode_v8_reference(data, pos)
+            if isinstance(k, int):
+                while len(arr) <= k:
+                    arr.append(None)
+                arr[k] = v
+        return arr, pos
+    return None, pos  # unknown tag — skip
+
+
+def _time(fn, payloads: list[bytes], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            fn(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tabs', type=int, default=100_000, help='Synthetic OneTab tabs')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best of)')
+    parser.add_argument('-o', '--output', type=str, help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    payloads = onetab_payloads(args.tabs)
+    mismatches = sum(decode_v8_reference(p)[0] != ote._decode_v8(p)[0] for p in payloads)
+    if mismatches:
+        sys.exit(f'{mismatches} payloads decode differently; not benchmarking.')
+
+    decoders = {
+        'reference': lambda p: decode_v8_reference(p, 0),
+        'iterative': lambda p: ote._decode_v8(p, 0),
+        'selective': lambda p: ote._decode_v8(p, 0, ote.ONETAB_RECORD_TYPES),
+    }
+    results = {}
+    for name, fn in decoders.items():
+        seconds = _time(fn, payloads, args.repeat)
+        results[name] = {'seconds': round(seconds, 4),
+                         'records_per_s': round(len(payloads) / seconds)}
+    baseline = results['reference']['seconds']
+    for result in results.values():
+        result['speedup'] = round(baseline / result['seconds'], 2)
+
+    report = json.dumps({
+        'benchmark': 'v8_decode',
+        'python': sys.version.split()[0],
+        'records': len(payloads),
+        'bytes': sum(map(len, payloads)),
+        'results': results,
+    }, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
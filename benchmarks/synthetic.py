@@ -0,0 +1,268 @@
+"""Synthetic data generators shared by the benchmark scripts.
+
+Everything here is written from scratch so benchmarks run on build boxes with
+no Chrome installed.
+"""
+
+import json
+import random
+import sqlite3
+import struct
+from pathlib import Path
+
+ONETAB_EXTENSION_ID = 'chphlpgkkbolifaimnlloiipkdnihall'
+CHROME_EPOCH_OFFSET_US = 11_644_473_600_000_000
+
+
+# ---------------------------------------------------------------------------
+# V8 serialization (the subset OneTab records use)
+# ---------------------------------------------------------------------------
+
+def encode_varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def encode_v8(value, version: int = 15) -> bytes:
+    """Serialize a JSON-like value the way V8's ValueSerializer does, with header."""
+    return b'\xff' + encode_varint(version) + _encode_v8_value(value)
+
+
+def _encode_v8_value(value) -> bytes:
+    if value is None:
+        return b'\x30'
+    if value is True:
+        return b'T'
+    if value is False:
+        return b'F'
+    if isinstance(value, int) and -(1 << 31) <= value < (1 << 31):
+        return b'I' + encode_varint(((value << 1) ^ (value >> 31)) & 0xFFFFFFFF)
+    if isinstance(value, (int, float)):
+        return b'N' + struct.pack('<d', float(value))
+    if isinstance(value, str):
+        try:
+            raw = value.encode('latin-1')
+            return b'"' + encode_varint(len(raw)) + raw
+        except UnicodeEncodeError:
+            raw = value.encode('utf-16-le')
+            return b'c' + encode_varint(len(raw) // 2) + raw
+    if isinstance(value, list):
+        body = b''.join(_encode_v8_value(v) for v in value)
+        return b'A' + encode_varint(len(value)) + body + b'$' + encode_varint(0) + encode_varint(len(value))
+    if isinstance(value, dict):
+        body = b''.join(_encode_v8_value(k) + _encode_v8_value(v) for k, v in value.items())
+        return b'o' + body + b'{' + encode_varint(len(value))
+    raise TypeError(f'cannot V8-encode {type(value).__name__}')
+
+
+# ---------------------------------------------------------------------------
+# OneTab records
+# ---------------------------------------------------------------------------
+
+def onetab_records(n_tabs: int, tabs_per_group: int = 25, seed: int = 0) -> list[dict]:
+    """OneTab IndexedDB-style records: groups, tabs, and some unrelated records."""
+    rnd = random.Random(seed)
+    records = []
+    n_groups = max(1, n_tabs // tabs_per_group)
+    base = 1.6e12
+    for g in range(n_groups):
+        records.append({
+            'id': f'g{g}', 'type': 'group', 'label': f'Group {g}' if g % 3 else '',
+            'color': rnd.choice(['', 'red', 'blue', 'green']),
+            'groupType': rnd.choice(['', 'pinned', 'starred']),
+            'createDate': base + g * 3.6e6, 'locked': bool(g % 2),
+            'meta': {'order': [g, g + 1], 'flags': {'collapsed': False}},
+        })
+    for t in range(n_tabs):
+        title = f'Tab {t} — ünïcødé' if t % 10 == 0 else f'Tab number {t}'
+        records.append({
+            'id': f't{t}', 'type': 'tab', 'parentIds': [f'g{t % n_groups}'],
+            'url': f'https://example{t % 97}.com/path/{t}?q={rnd.randint(0, 10**6)}',
+            'title': title, 'createDate': base + t * 1000.0,
+            'favIconUrl': f'https://example{t % 97}.com/favicon.ico',
+        })
+        if t % 50 == 0:
+            records.append({'type': 'settings', 'id': f's{t}',
+                            'blob': [rnd.random() for _ in range(20)]})
+    rnd.shuffle(records)
+    return records
+
+
+def onetab_payloads(n_tabs: int, seed: int = 0) -> list[bytes]:
+    """V8-encoded OneTab records as they appear after the IndexedDB value header."""
+    return [encode_v8(record) for record in onetab_records(n_tabs, seed=seed)]
+
+
+# ---------------------------------------------------------------------------
+# Chrome user-data directories
+# ---------------------------------------------------------------------------
+
+def _now_chrome_us(rnd: random.Random, span_days: int = 365) -> int:
+    """A Chrome timestamp (µs since 1601) within the last `span_days` of 2026."""
+    end = 1_798_761_600_000_000 + CHROME_EPOCH_OFFSET_US   # 2027-01-01 UTC
+    return end - rnd.randrange(span_days * 86_400_000_000)
+
+
+def _url(rnd: random.Random, domains: int = 500) -> str:
+    return f'https://site{rnd.randrange(domains)}.example/{rnd.randrange(10**6)}'
+
+
+def bookmarks_json(n: int, depth: int, seed: int = 0) -> dict:
+    """A Bookmarks file with about `n` URLs spread over folders `depth` deep."""
+    rnd = random.Random(seed)
+    ids = iter(range(1, 1 << 62))
+
+    def folder(name: str, level: int, budget: int) -> dict:
+        node = {'type': 'folder', 'name': name, 'id': str(next(ids)),
+                'date_added': str(_now_chrome_us(rnd)), 'children': []}
+        subfolders = 3 if level < depth and budget > 6 else 0
+        share = budget // (subfolders + 1)
+        for i in range(subfolders):
+            node['children'].append(folder(f'{name[:1]}{level}.{i}', level + 1, share))
+        for i in range(budget - share * subfolders):
+            node['children'].append({
+                'type': 'url', 'name': f'Bookmark {next(ids)}', 'url': _url(rnd),
+                'id': str(next(ids)), 'date_added': str(_now_chrome_us(rnd)),
+            })
+        return node
+
+    return {'version': 1, 'roots': {
+        'bookmark_bar': folder('Bookmarks bar', 1, n * 3 // 4),
+        'other': folder('Other bookmarks', 1, n - n * 3 // 4),
+        'synced': folder('Mobile bookmarks', 1, 0),
+    }}
+
+
+def write_history(path: Path, n: int, seed: int = 0) -> None:
+    """A History SQLite file with Chrome's urls/visits schema and `n` URLs."""
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE urls(id INTEGER PRIMARY KEY AUTOINCREMENT, url LONGVARCHAR,
+            title LONGVARCHAR, visit_count INTEGER DEFAULT 0 NOT NULL,
+            typed_count INTEGER DEFAULT 0 NOT NULL, last_visit_time INTEGER NOT NULL,
+            hidden INTEGER DEFAULT 0 NOT NULL);
+        CREATE INDEX urls_url_index ON urls (url);
+        CREATE TABLE visits(id INTEGER PRIMARY KEY, url INTEGER NOT NULL,
+            visit_time INTEGER NOT NULL, from_visit INTEGER, transition INTEGER DEFAULT 0 NOT NULL,
+            segment_id INTEGER, visit_duration INTEGER DEFAULT 0 NOT NULL);
+        CREATE INDEX visits_url_index ON visits (url);
+        CREATE INDEX visits_time_index ON visits (visit_time);
+    ''')
+    urls, visits = [], []
+    for i in range(1, n + 1):
+        times = sorted(_now_chrome_us(rnd) for _ in range(rnd.randint(1, 3)))
+        title = rnd.choice(('', f'Page {i}', f'Pâge {i} — ünïcødé'))
+        urls.append((i, _url(rnd), title, len(times), rnd.randint(0, 1), times[-1]))
+        visits.extend((i, t, 0x30000000 | rnd.randrange(10), rnd.randrange(10**8)) for t in times)
+    conn.executemany('INSERT INTO urls(id, url, title, visit_count, typed_count, last_visit_time) '
+                     'VALUES (?, ?, ?, ?, ?, ?)', urls)
+    conn.executemany('INSERT INTO visits(url, visit_time, transition, visit_duration) '
+                     'VALUES (?, ?, ?, ?)', visits)
+    conn.commit()
+    conn.close()
+
+
+def _idb_prefix(db_id: int, os_id: int, index_id: int) -> bytes:
+    a, b, c = (n.to_bytes(max(1, (n.bit_length() + 7) // 8), 'little')
+               for n in (db_id, os_id, index_id))
+    return bytes(((len(a) - 1) << 5 | (len(b) - 1) << 2 | (len(c) - 1),)) + a + b + c
+
+
+def _idb_string(s: str) -> bytes:
+    return encode_varint(len(s)) + s.encode('utf-16-be')
+
+
+def write_onetab_idb(path: Path, n_tabs: int, seed: int = 0,
+                     records: list[dict] | None = None) -> None:
+    """An IndexedDB LevelDB laid out like Chrome's: metadata, records, exists and index entries.
+
+    `records` replaces the generated `onetab_records(n_tabs)`.
+    """
+    import plyvel
+
+    def bytewise(a, b): return (a > b) - (a < b)
+    db = plyvel.DB(str(path), create_if_missing=True,
+                   comparator=bytewise, comparator_name=b'idb_cmp1')
+    with db.write_batch() as wb:
+        wb.put(_idb_prefix(0, 0, 0) + b'\x00', b'\x03')      # schema version
+        wb.put(_idb_prefix(0, 0, 0) + bytes((201,)) +
+               _idb_string(f'chrome-extension_{ONETAB_EXTENSION_ID}_0') + _idb_string('onetab'), b'\x01')
+        wb.put(_idb_prefix(1, 0, 0) + bytes((50,)) + encode_varint(1) + b'\x00',
+               _idb_string('records'))
+        if records is None:
+            records = onetab_records(n_tabs, seed=seed)
+        for n, record in enumerate(records):
+            key = b'\x01' + _idb_string(record.get('id', f'r{n}'))
+            # varint schema version, Blink envelope v21 with trailer field, then V8
+            value = (encode_varint(1) + b'\xff\x15\xfe' + bytes(12) + encode_v8(record))
+            wb.put(_idb_prefix(1, 1, 1) + key, value)
+            wb.put(_idb_prefix(1, 1, 2) + key, b'\x01')
+            wb.put(_idb_prefix(1, 1, 30) + b'\x01' + _idb_string(record['type']) + key,
+                   encode_varint(1) + key)
+    db.compact_range()
+    db.close()
+
+
+def write_onetab_legacy(path: Path, n_tabs: int, seed: int = 0) -> None:
+    """A legacy `Local Extension Settings` LevelDB with OneTab's double-encoded state."""
+    import plyvel
+
+    rnd = random.Random(seed)
+    groups = []
+    for g in range(max(1, n_tabs // 25)):
+        groups.append({'id': f'g{g}', 'label': f'Group {g}' if g % 3 else '',
+                       'color': rnd.choice(['', 'red', 'blue']), 'groupType': '',
+                       'createDate': 1.6e12 + g * 3.6e6, 'tabsMeta': []})
+    for t in range(n_tabs):
+        groups[t % len(groups)]['tabsMeta'].append(
+            {'id': f't{t}', 'title': f'Tab {t}', 'url': _url(rnd)})
+    db = plyvel.DB(str(path), create_if_missing=True)
+    db.put(b'state', json.dumps(json.dumps({'tabGroups': groups})).encode())
+    db.close()
+
+
+def make_user_data(root: Path, profiles: int = 3, bookmarks: int = 1000,
+                   bookmark_depth: int = 4, history: int = 20_000,
+                   onetab_tabs: int = 2000, onetab_format: str = 'mixed',
+                   seed: int = 0) -> dict:
+    """Create a Chrome user-data directory under `root` and return its sizes.
+
+    Every profile gets Preferences, Bookmarks and History. OneTab data is in
+    IndexedDB, the legacy LevelDB, or alternates between them per profile
+    (`onetab_format` = 'idb', 'legacy' or 'mixed'); `onetab_tabs=0` omits it.
+    """
+    root = Path(root)
+    summary = {'profiles': profiles, 'bookmarks': 0, 'history': 0, 'onetab_tabs': 0}
+    for p in range(profiles):
+        profile_dir = root / ('Default' if p == 0 else f'Profile {p}')
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        (profile_dir / 'Preferences').write_text(
+            json.dumps({'profile': {'name': f'Person {p + 1}'}}), encoding='utf-8')
+        (profile_dir / 'Bookmarks').write_text(
+            json.dumps(bookmarks_json(bookmarks, bookmark_depth, seed + p), indent=3),
+            encoding='utf-8')
+        write_history(profile_dir / 'History', history, seed + p)
+        summary['bookmarks'] += bookmarks
+        summary['history'] += history
+        if not onetab_tabs:
+            continue
+        legacy = onetab_format == 'legacy' or (onetab_format == 'mixed' and p % 2)
+        if legacy:
+            path = profile_dir / 'Local Extension Settings' / ONETAB_EXTENSION_ID
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_onetab_legacy(path, onetab_tabs, seed + p)
+        else:
+            path = (profile_dir / 'IndexedDB' /
+                    f'chrome-extension_{ONETAB_EXTENSION_ID}_0.indexeddb.leveldb')
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_onetab_idb(path, onetab_tabs, seed + p)
+        summary['onetab_tabs'] += onetab_tabs
+    return summary
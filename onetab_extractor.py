@@ -8,29 +8,199 @@
 # requires-python = ">=3.12"
 # ///
 
-import plyvel
 import json
+import glob
+import fnmatch
+import re
 import csv
 import shutil
 import sqlite3
 import struct
 import sys
 import os
+import time
 import argparse
+import heapq
+import hashlib
+import marshal
+import select
+import pickle
+import tempfile
+import contextvars
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from itertools import chain, islice
 from pathlib import Path
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
+from datetime import datetime, timedelta, timezone
+from array import array
+from functools import lru_cache, partial
+from typing import NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Heavy or optional modules (plyvel, rich, dotenv, concurrent.futures, cProfile,
+# pyarrow) are imported where they are used, so short runs that never need them
+# start faster; see benchmarks/bench_import.py.
+
+
+def _load_env() -> None:
+    """`load_dotenv()`, importing python-dotenv only if there is a `.env` to load.
+
+    Searches this file's directory and its parents, as `find_dotenv` does.
+    """
+    here = Path(os.path.abspath(__file__)).parent
+    if any((directory / '.env').is_file() for directory in (here, *here.parents)):
+        from dotenv import load_dotenv
+        load_dotenv()
+
+
+_load_env()
+
+_MARKUP = re.compile(r'\[/?(?:(?:bold|dim|italic|underline|red|green|yellow|blue|cyan|magenta|white)'
+                     r'(?: (?:bold|dim|italic|underline|red|green|yellow|blue|cyan|magenta|white))*)?\]')
+_ALERT_MARKUP = ('[yellow]', '[bold yellow]', '[bold red]')
+
+
+class PlainConsole:
+    """Drop-in for `rich.console.Console.print` that loads rich only when needed.
+
+    Strings are printed as plain text with their markup stripped unless stdout
+    is a terminal (or `plain` is False); tables and panels always go through
+    rich. `quiet` (-qq) silences everything; `alerts_only` (-q) drops log lines except
+    warnings and errors (messages that start with yellow or red markup), but
+    still prints tables and panels, which are only made when asked for.
+    When `log_handler` is set in the current context, log lines go to it as
+    plain text instead (see `Extractor`).
+    """
+
+    def __init__(self):
+        self.quiet = False
+        self.alerts_only = False
+        self.plain: bool | None = None      # None: plain unless stdout is a TTY
+        self._rich = None
+
+    def print(self, *objects, **kwargs) -> None:
+        handler = log_handler.get()
+        if handler is not None:
+            if all(isinstance(o, str) for o in objects):
+                handler(' '.join(_MARKUP.sub('', o) for o in objects).strip())
+            return
+        if self.quiet:
+            return
+        if (self.alerts_only and objects and isinstance(objects[0], str)
+                and not objects[0].startswith(_ALERT_MARKUP)):
+            return
+        if self.plain is None:
+            self.plain = not sys.stdout.isatty()
+        if self.plain and all(isinstance(o, str) for o in objects):
+            print(*(_MARKUP.sub('', o) for o in objects), **kwargs)
+            return
+        if self._rich is None:
+            from rich.console import Console
+            self._rich = Console()
+        self._rich.print(*objects, **kwargs)
 
-load_dotenv()
 
-console = Console()
+# Where `console` sends log lines instead of printing them. A context variable,
+# so each `Extractor` session (thread, interleaved iterator) logs to its own.
+log_handler: contextvars.ContextVar = contextvars.ContextVar('log_handler', default=None)
+console = PlainConsole()
 
 ONETAB_EXTENSION_ID = 'chphlpgkkbolifaimnlloiipkdnihall'
-CHROME_EPOCH = datetime(1601, 1, 1)
+UNIX_EPOCH = datetime(1970, 1, 1)
+CHROME_EPOCH_OFFSET_US = 11_644_473_600_000_000    # 1601-01-01 -> 1970-01-01
+MIN_DATE_US = (datetime.min - UNIX_EPOCH) // timedelta(microseconds=1)
+MAX_DATE_US = (datetime(9999, 12, 31, 23, 59, 59) - UNIX_EPOCH) // timedelta(microseconds=1)
+NO_DATE = 0
 CSV_FIELDS = ['Profile', 'Source', 'Group', 'Date', 'Color', 'Title', 'URL']
+_FIELD_INDEX = {name: i for i, name in enumerate(CSV_FIELDS)}
+
+
+class Row(NamedTuple):
+    """One exported row, laid out in CSV_FIELDS order.
+
+    A plain tuple with no per-row dict. Low-cardinality columns (Profile, Source,
+    Group, Color) are interned, so every row shares one string object per
+    distinct value. `Date` is an integer: wall-clock microseconds since
+    1970-01-01 (see `chrome_time_to_micros`), or NO_DATE; it only becomes a
+    string in the writer (`format_minute`). `row['URL']` and `row.get('URL')` still work, so scripts
+    written against the old dict rows keep running; use `row._asdict()` for a
+    real dict. History rows of --history-visits exports are `VisitRow`s.
+    """
+    Profile: str
+    Source: str
+    Group: str
+    Date: int
+    Color: str
+    Title: str
+    URL: str
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = _FIELD_INDEX[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default=None):
+        index = _FIELD_INDEX.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+
+# Extra columns of --history-visits exports (see `VisitRow`).
+VISIT_FIELDS = ['Transition', 'VisitCount', 'TypedCount', 'VisitDuration']
+_VISIT_FIELD_INDEX = {name: i for i, name in enumerate(CSV_FIELDS + VISIT_FIELDS)}
+
+
+class VisitRow(NamedTuple):
+    """A row of a --history-visits export: Row's columns, then VISIT_FIELDS.
+
+    History visits fill them in: `Transition` is the visit's `transition_label`,
+    `VisitCount`/`TypedCount` are the URL's counts and `VisitDuration` is
+    Chrome's `visit_duration` in microseconds. Other sources' rows are widened
+    with `widen_rows` (Transition '', the rest None), so an export has one shape.
+    """
+    Profile: str
+    Source: str
+    Group: str
+    Date: int
+    Color: str
+    Title: str
+    URL: str
+    Transition: str
+    VisitCount: int | None
+    TypedCount: int | None
+    VisitDuration: int | None
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = _VISIT_FIELD_INDEX[key]
+            except KeyError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default=None):
+        index = _VISIT_FIELD_INDEX.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _visit_row(values) -> VisitRow:
+    """Rebuild a VisitRow read back from disk, re-interning its low-cardinality columns."""
+    profile, source, group, date, color, title, url, transition, *counts = values
+    return VisitRow(sys.intern(profile), sys.intern(source), _intern(group), date,
+                    _intern(color), title, url, _intern(transition), *counts)
+
+
+def widen_rows(rows: Iterable[Row]) -> Iterator[VisitRow]:
+    """Rows as VisitRows, for --history-visits exports: plain rows (bookmarks,
+    OneTab, History read without visits) get an empty Transition and no counts."""
+    for row in rows:
+        yield row if type(row) is VisitRow else VisitRow(*row, '', None, None, None)
 
 
 # ---------------------------------------------------------------------------
@@ -51,23 +221,73 @@ def get_chrome_dir() -> Path:
         return Path('~/Library/Application Support/Google/Chrome').expanduser()
 
 
-def chrome_time_to_str(micros: int) -> str:
+def get_user_cache_dir() -> Path:
+    """Per-user cache location for --cache: %LOCALAPPDATA% on Windows,
+    $XDG_CACHE_HOME (~/.cache) on Linux, ~/Library/Caches on macOS."""
+    platform = os.getenv('PLATFORM', '').lower()
+    if platform == 'windows' or (not platform and sys.platform == 'win32'):
+        local_app_data = os.getenv('LOCALAPPDATA', r'C:\Users\Default\AppData\Local')
+        return Path(local_app_data) / 'onetab_extractor' / 'Cache'
+    elif platform == 'linux' or (not platform and sys.platform.startswith('linux')):
+        return Path(os.getenv('XDG_CACHE_HOME') or '~/.cache').expanduser() / 'onetab_extractor'
+    else:
+        return Path('~/Library/Caches/onetab_extractor').expanduser()
+
+
+# Dates travel through the pipeline as integer wall-clock microseconds since
+# 1970-01-01, truncated to the second. Chrome times are UTC and OneTab times are
+# shifted into local time, exactly as the string formatters always did, so the
+# integers sort and round the same way the old strings did.
+
+def chrome_time_to_micros(micros: int) -> int:
+    """Convert a Chrome (1601-epoch, UTC) timestamp to pipeline microseconds."""
     if not micros:
+        return NO_DATE
+    us = (micros - CHROME_EPOCH_OFFSET_US) // 1_000_000 * 1_000_000
+    return us if MIN_DATE_US <= us <= MAX_DATE_US else NO_DATE
+
+
+def ms_epoch_to_micros(ms: float) -> int:
+    """Convert a Unix millisecond timestamp to local wall-clock pipeline microseconds."""
+    if not ms:
+        return NO_DATE
+    try:
+        seconds = int(ms // 1000)
+        us = (seconds + time.localtime(seconds).tm_gmtoff) * 1_000_000
+    except (OSError, OverflowError, ValueError, TypeError):
+        return NO_DATE
+    return us if MIN_DATE_US <= us <= MAX_DATE_US else NO_DATE
+
+
+def round_micros_to_minute(us: int) -> int:
+    """Round pipeline microseconds to the nearest minute (:30 rounds up)."""
+    if not us:
+        return us
+    return (us + 30_000_000) // 60_000_000 * 60_000_000
+
+
+def format_micros(us: int, fmt: str = '%Y-%m-%d %H:%M:%S') -> str:
+    if not us:
         return ''
     try:
-        return (CHROME_EPOCH + timedelta(microseconds=micros)).strftime('%Y-%m-%d %H:%M:%S')
+        return (UNIX_EPOCH + timedelta(microseconds=us)).strftime(fmt)
     except (OverflowError, ValueError):
         return ''
 
 
+@lru_cache(maxsize=65536)
+def format_minute(us: int) -> str:
+    """Writer-side formatter for rounded dates: 'YYYY-MM-DD HH:MM' or ''."""
+    return format_micros(us, '%Y-%m-%d %H:%M')
+
+
+def chrome_time_to_str(micros: int) -> str:
+    return format_micros(chrome_time_to_micros(micros))
+
+
 def ms_epoch_to_str(ms: float) -> str:
     """Convert Unix millisecond timestamp to string."""
-    if not ms:
-        return ''
-    try:
-        return datetime.fromtimestamp(ms / 1000).strftime('%Y-%m-%d %H:%M:%S')
-    except (OSError, OverflowError, ValueError):
-        return ''
+    return format_micros(ms_epoch_to_micros(ms))
 
 
 def round_to_minute(date_str: str) -> str:
@@ -87,13 +307,40 @@ def round_to_minute(date_str: str) -> str:
 # Profile discovery
 # ---------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
+def _fast_json_loads():
+    """orjson.loads when the optional `orjson` extra is installed, else None."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson.loads
+
+
+def read_json(path: Path):
+    """Parse a UTF-8 JSON file, with orjson when available.
+
+    orjson parses Chrome's large Bookmarks and Preferences files several times
+    faster than the standard library. It is stricter about a few things json
+    accepts (lone surrogate escapes, for one), so those files fall back to json.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    loads = _fast_json_loads()
+    if loads is not None:
+        try:
+            return loads(data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
 def get_profile_identifier(profile_dir: Path) -> str:
     """Return 'FolderName' or 'FolderName (DisplayName)' for a profile directory."""
     folder = profile_dir.name  # always included: 'Default', 'Profile 1', etc.
     prefs_path = profile_dir / 'Preferences'
     try:
-        with open(prefs_path, 'r', encoding='utf-8') as f:
-            prefs = json.load(f)
+        prefs = read_json(prefs_path)
         display = prefs.get('profile', {}).get('name', '').strip()
         if display and display != folder:
             return f'{folder} ({display})'
@@ -102,7 +349,59 @@ def get_profile_identifier(profile_dir: Path) -> str:
     return folder
 
 
-def find_profiles(chrome_dir: Path) -> list[tuple[Path, str]]:
+PROFILE_CACHE_VERSION = 1
+
+
+class ProfileCache:
+    """Profile identifiers keyed by profile directory, persisted as JSON.
+
+    An entry is reused while the profile's `Preferences` keeps its size and
+    mtime, so rescanning a large tree does not parse every Preferences file
+    again. With no `path`, it only memoizes within the run.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.entries: dict[str, list] = {}
+        self.dirty = False
+        if path is not None:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == PROFILE_CACHE_VERSION:
+                    self.entries = data['profiles']
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass
+
+    def identifier(self, profile_dir: Path) -> str:
+        try:
+            info = (profile_dir / 'Preferences').stat()
+            stamp = [info.st_size, info.st_mtime_ns]
+        except OSError:
+            stamp = None
+        key = str(profile_dir)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        name = get_profile_identifier(profile_dir)
+        self.entries[key] = [stamp, name]
+        self.dirty = True
+        return name
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': PROFILE_CACHE_VERSION, 'profiles': self.entries}, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def find_profiles(chrome_dir: Path, names: ProfileCache | None = None) -> list[tuple[Path, str]]:
+    """(profile dir, identifier) for every profile under a user-data dir that has data."""
+    identify = names.identifier if names is not None else get_profile_identifier
     results = []
     try:
         candidates = sorted(chrome_dir.iterdir())
@@ -120,98 +419,398 @@ def find_profiles(chrome_dir: Path) -> list[tuple[Path, str]]:
                 f'chrome-extension_{ONETAB_EXTENSION_ID}_0.indexeddb.leveldb').exists()
         )
         if has_data:
-            results.append((item, get_profile_identifier(item)))
+            results.append((item, identify(item)))
     return results
 
 
+# Chromium-family user-data directories, relative to a home directory, on
+# Linux, macOS and Windows. A snapshot of any OS can be scanned from any OS.
+BROWSER_LAYOUTS = (
+    ('Chrome', '.config/google-chrome'),
+    ('Chrome Beta', '.config/google-chrome-beta'),
+    ('Chromium', '.config/chromium'),
+    ('Brave', '.config/BraveSoftware/Brave-Browser'),
+    ('Edge', '.config/microsoft-edge'),
+    ('Chrome', 'Library/Application Support/Google/Chrome'),
+    ('Chromium', 'Library/Application Support/Chromium'),
+    ('Brave', 'Library/Application Support/BraveSoftware/Brave-Browser'),
+    ('Edge', 'Library/Application Support/Microsoft Edge'),
+    ('Chrome', 'AppData/Local/Google/Chrome/User Data'),
+    ('Chromium', 'AppData/Local/Chromium/User Data'),
+    ('Brave', 'AppData/Local/BraveSoftware/Brave-Browser/User Data'),
+    ('Edge', 'AppData/Local/Microsoft/Edge/User Data'),
+)
+DISCOVERY_THREADS = 16
+
+
+def is_user_data_dir(path: Path) -> bool:
+    return (path / 'Local State').is_file() or (path / 'Default').is_dir()
+
+
+def _probe_root(root: Path) -> list[tuple[Path, Path, str | None]]:
+    """User-data dirs at or under one matched root, as (dir, label anchor, browser).
+
+    A root is either a user-data dir itself or a home directory holding one or
+    more browsers in the standard layouts.
+    """
+    if is_user_data_dir(root):
+        for browser, relative in BROWSER_LAYOUTS:
+            depth = relative.count('/') + 1
+            if root.as_posix().endswith('/' + relative) and len(root.parents) > depth:
+                return [(root, root.parents[depth - 1], browser)]
+        return [(root, root, None)]
+    return [(root / relative, root, browser) for browser, relative in BROWSER_LAYOUTS
+            if is_user_data_dir(root / relative)]
+
+
+def _user_data_labels(found: list[tuple[Path, Path, str | None]]) -> list[str]:
+    """Short unique labels: 'home/Browser' for the standard layouts, else the dir
+    name, with parent directories prepended only where labels would collide."""
+    parts = [anchor.parts[1:] if anchor.anchor else anchor.parts for _, anchor, _ in found]
+    depths = [1] * len(found)
+
+    def label(i: int) -> str:
+        name = '/'.join(parts[i][-depths[i]:])
+        browser = found[i][2]
+        return f'{name}/{browser}' if browser else name
+
+    while True:
+        labels = [label(i) for i in range(len(found))]
+        seen: dict[str, list[int]] = {}
+        for i, text in enumerate(labels):
+            seen.setdefault(text, []).append(i)
+        clashes = [i for group in seen.values() if len(group) > 1 for i in group
+                   if depths[i] < len(parts[i])]
+        if not clashes:
+            return labels
+        for i in clashes:
+            depths[i] += 1
+
+
+def discover_profiles(patterns: list[str], names: ProfileCache | None = None,
+                      threads: int = DISCOVERY_THREADS) -> list[tuple[Path, str]]:
+    """Profiles of every Chromium-family user-data dir under roots or glob patterns.
+
+    Each pattern is expanded with `glob` (`**` recurses); every match is probed
+    for user-data dirs in worker threads, since large trees of home directories
+    are usually on slow or network storage. Profiles are named
+    '<label>/<profile identifier>', e.g. 'alice/Brave/Default (Alice)'.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    roots = sorted({Path(match) for pattern in patterns
+                    for match in glob.glob(os.path.expanduser(pattern), recursive=True)
+                    if os.path.isdir(match)})
+    names = names if names is not None else ProfileCache()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        found, seen = [], set()
+        for probed in pool.map(_probe_root, roots):
+            for entry in probed:
+                real = os.path.realpath(entry[0])
+                if real not in seen:
+                    seen.add(real)
+                    found.append(entry)
+        labels = _user_data_labels(found)
+        per_dir = list(pool.map(partial(find_profiles, names=names), [f[0] for f in found]))
+    names.save()
+    console.print(f'Found [bold]{len(found)}[/bold] browser user-data dir(s) under '
+                  f'{len(roots)} root(s).')
+    return [(profile_dir, f'{label}/{name}')
+            for label, profiles in zip(labels, per_dir) for profile_dir, name in profiles]
+
+
+def select_profiles(profiles: list[tuple[Path, str]],
+                    patterns: list[str] | None) -> list[tuple[Path, str]]:
+    """Profiles whose name or directory name matches a glob in `patterns`
+    (case-insensitive); all of them when there are no patterns."""
+    if not patterns:
+        return profiles
+    patterns = [pattern.lower() for pattern in patterns]
+    return [(profile_dir, name) for profile_dir, name in profiles
+            if any(fnmatch.fnmatchcase(name.lower(), pattern)
+                   or fnmatch.fnmatchcase(profile_dir.name.lower(), pattern)
+                   for pattern in patterns)]
+
+
 # ---------------------------------------------------------------------------
 # Minimal V8 deserializer (for OneTab IndexedDB values)
 # ---------------------------------------------------------------------------
 
-def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
-    result, shift = 0, 0
-    while pos < len(data):
-        b = data[pos]; pos += 1
+_V8_PREFIX_TAGS = frozenset((0xFF, 0x00, 0x3F))   # version, padding, verify-count
+_V8_OBJECT, _V8_DENSE, _V8_SPARSE = 0x6F, 0x41, 0x61
+_V8_END_OBJECT, _V8_END_DENSE, _V8_END_SPARSE = 0x7B, 0x24, 0x40
+_NO_KEY = object()
+_unpack_double = struct.Struct('<d').unpack_from
+ONETAB_RECORD_TYPES = frozenset(('group', 'tab'))
+
+
+def _v8_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result, shift, end = 0, 0, len(data)
+    while pos < end:
+        b = data[pos]
+        pos += 1
         result |= (b & 0x7F) << shift
-        if not (b & 0x80):
-            return result, pos
+        if b < 0x80:
+            break
         shift += 7
     return result, pos
 
 
-def _decode_v8(data: bytes, pos: int = 0) -> tuple[any, int]:
-    """Decode one V8-serialized value starting at pos. Returns (value, new_pos)."""
-    if pos >= len(data):
-        return None, pos
-    tag = data[pos]; pos += 1
-
-    if tag == 0xFF:                         # version wrapper
-        _, pos = _read_varint(data, pos)
-        return _decode_v8(data, pos)
-    if tag in (0x00, 0x3F):                 # padding / verify-count
-        if tag == 0x3F: _, pos = _read_varint(data, pos)
-        return _decode_v8(data, pos)
-    if tag in (0x5F, 0x30): return None, pos   # undefined / null
-    if tag == 0x54: return True, pos           # true
-    if tag == 0x46: return False, pos          # false
-    if tag == 0x49:                            # int32 zigzag
-        n, pos = _read_varint(data, pos)
-        return (n >> 1) ^ -(n & 1), pos
-    if tag == 0x55:                            # uint32
-        n, pos = _read_varint(data, pos)
-        return n, pos
-    if tag in (0x4E, 0x44):                    # double / date
-        return struct.unpack_from('<d', data, pos)[0], pos + 8
-    if tag == 0x22:                            # one-byte string
-        n, pos = _read_varint(data, pos)
-        return data[pos:pos + n].decode('latin-1', errors='replace'), pos + n
-    if tag == 0x53:                            # utf-8 string
-        n, pos = _read_varint(data, pos)
-        return data[pos:pos + n].decode('utf-8', errors='replace'), pos + n
-    if tag == 0x63:                            # two-byte string
-        n, pos = _read_varint(data, pos)
-        return data[pos:pos + n * 2].decode('utf-16-le', errors='replace'), pos + n * 2
-    if tag == 0x5E:                            # object reference (skip)
-        _, pos = _read_varint(data, pos)
-        return None, pos
-    if tag == 0x6F:                            # JS object
-        obj = {}
-        while pos < len(data):
-            if data[pos] == 0x7B:              # end '{'
-                pos += 1; _, pos = _read_varint(data, pos); break
-            k, pos = _decode_v8(data, pos)
-            v, pos = _decode_v8(data, pos)
-            if isinstance(k, str):
-                obj[k] = v
-        return obj, pos
-    if tag == 0x41:                            # dense array
-        n, pos = _read_varint(data, pos)
-        arr = []
-        for _ in range(n):
-            v, pos = _decode_v8(data, pos)
-            arr.append(v)
-        if pos < len(data) and data[pos] == 0x24:  # end '$'
+def _v8_none(data, pos): return None, pos
+def _v8_true(data, pos): return True, pos
+def _v8_false(data, pos): return False, pos
+def _v8_double(data, pos): return _unpack_double(data, pos)[0], pos + 8
+
+
+def _v8_int32(data, pos):
+    n, pos = _v8_varint(data, pos)
+    return (n >> 1) ^ -(n & 1), pos
+
+
+def _v8_ref(data, pos):
+    return None, _v8_varint(data, pos)[1]
+
+
+def _v8_utf8(data, pos):
+    n, pos = _v8_varint(data, pos)
+    return data[pos:pos + n].decode('utf-8', errors='replace'), pos + n
+
+
+# Tag -> reader(data, pos) -> (value, pos) for the less common scalar tags; the
+# hot ones (strings, numbers, containers) are handled inline in _decode_v8.
+# Unknown tags decode as None, like the reference decoder.
+_V8_SCALARS = [_v8_none] * 256
+for _tag, _reader in ((0x54, _v8_true), (0x46, _v8_false), (0x49, _v8_int32),
+                      (0x55, _v8_varint), (0x4E, _v8_double), (0x44, _v8_double),
+                      (0x53, _v8_utf8), (0x5E, _v8_ref)):
+    _V8_SCALARS[_tag] = _reader
+del _tag, _reader
+
+
+def _decode_v8(data: bytes, pos: int = 0, types: frozenset | None = None) -> tuple[any, int]:
+    """Decode one V8-serialized value starting at pos. Returns (value, new_pos).
+
+    Iterative: the open container is kept in locals and its parents on an
+    explicit stack, so deep nesting never hits the recursion limit. Strings and
+    numbers are decoded inline; rarer tags dispatch through _V8_SCALARS.
+    Produces the same values as the original recursive decoder (kept in
+    benchmarks/bench_v8.py as `decode_v8_reference`).
+
+    With `types`, decoding is selective: the value must be an object whose
+    top-level `type` field is in `types`, and (None, pos) is returned as soon
+    as that is known to be false, without decoding the rest of the record.
+    """
+    if type(data) is not bytes:
+        data = bytes(data)
+    end = len(data)
+    scalars = _V8_SCALARS
+    stack = []          # suspended parents: (kind, container, slot)
+    kind = 0            # current container: 0 (top level), _V8_OBJECT, _V8_DENSE, _V8_SPARSE
+    cont = None
+    slot = _NO_KEY      # object/sparse: pending key or _NO_KEY; dense: elements left
+    while True:
+        # -- read one value, or open a container and continue --------------
+        if pos >= end:
+            value = None
+            if kind == _V8_DENSE and slot > 1:  # truncated: pad the rest at once
+                cont.extend([None] * (slot - 1))
+                slot = 1
+        else:
+            tag = data[pos]
             pos += 1
-            _, pos = _read_varint(data, pos)
-            _, pos = _read_varint(data, pos)
-        return arr, pos
-    if tag == 0x61:                            # sparse array
-        length, pos = _read_varint(data, pos)
-        arr = []
-        while pos < len(data):
-            if data[pos] == 0x40:              # end '@'
+            while tag in _V8_PREFIX_TAGS:
+                if tag != 0x00:
+                    _, pos = _v8_varint(data, pos)
+                if pos >= end:
+                    tag = None
+                    break
+                tag = data[pos]
                 pos += 1
-                _, pos = _read_varint(data, pos)
-                _, pos = _read_varint(data, pos)
-                break
-            k, pos = _decode_v8(data, pos)
-            v, pos = _decode_v8(data, pos)
-            if isinstance(k, int):
-                while len(arr) <= k:
-                    arr.append(None)
-                arr[k] = v
-        return arr, pos
-    return None, pos  # unknown tag — skip
+            if tag == 0x22 or tag == 0x63:      # one-byte / two-byte string
+                n = data[pos] if pos < end else 0x80
+                if n < 0x80:
+                    pos += 1
+                else:
+                    n, pos = _v8_varint(data, pos)
+                if tag == 0x22:
+                    value = data[pos:pos + n].decode('latin-1')
+                else:
+                    n *= 2
+                    value = data[pos:pos + n].decode('utf-16-le', errors='replace')
+                pos += n
+            elif tag == _V8_OBJECT:
+                if pos >= end or data[pos] != _V8_END_OBJECT:
+                    stack.append((kind, cont, slot))
+                    kind, cont, slot = _V8_OBJECT, {}, _NO_KEY
+                    continue
+                _, pos = _v8_varint(data, pos + 1)
+                value = {}
+            elif tag == 0x4E or tag == 0x44:    # double / date
+                value = _unpack_double(data, pos)[0]
+                pos += 8
+            elif tag == 0x49:                   # int32 zigzag
+                n = data[pos] if pos < end else 0x80
+                if n < 0x80:
+                    pos += 1
+                else:
+                    n, pos = _v8_varint(data, pos)
+                value = (n >> 1) ^ -(n & 1)
+            elif tag == 0x5F or tag == 0x30 or tag is None:
+                value = None
+            elif tag == _V8_DENSE:
+                n, pos = _v8_varint(data, pos)
+                if n:
+                    stack.append((kind, cont, slot))
+                    kind, cont, slot = _V8_DENSE, [], n
+                    continue
+                if pos < end and data[pos] == _V8_END_DENSE:
+                    _, pos = _v8_varint(data, pos + 1)
+                    _, pos = _v8_varint(data, pos)
+                value = []
+            elif tag == _V8_SPARSE:
+                _, pos = _v8_varint(data, pos)
+                if pos >= end or data[pos] != _V8_END_SPARSE:
+                    stack.append((kind, cont, slot))
+                    kind, cont, slot = _V8_SPARSE, [], _NO_KEY
+                    continue
+                _, pos = _v8_varint(data, pos + 1)
+                _, pos = _v8_varint(data, pos)
+                value = []
+            else:
+                value, pos = scalars[tag](data, pos)
+
+        # -- store it, closing every container it completes -----------------
+        while True:
+            if kind == _V8_OBJECT:
+                if slot is _NO_KEY:
+                    slot = value
+                    break
+                if type(slot) is str:
+                    cont[slot] = value
+                    if types is not None and slot == 'type' and len(stack) == 1 \
+                            and not (type(value) is str and value in types):
+                        return None, pos
+                slot = _NO_KEY
+                if pos < end:
+                    if data[pos] != _V8_END_OBJECT:
+                        break
+                    _, pos = _v8_varint(data, pos + 1)
+            elif kind == _V8_DENSE:
+                cont.append(value)
+                slot -= 1
+                if slot:
+                    break
+                if pos < end and data[pos] == _V8_END_DENSE:
+                    _, pos = _v8_varint(data, pos + 1)
+                    _, pos = _v8_varint(data, pos)
+            elif kind == _V8_SPARSE:
+                if slot is _NO_KEY:
+                    slot = value
+                    break
+                if isinstance(slot, int):
+                    if len(cont) <= slot:
+                        cont.extend([None] * (slot + 1 - len(cont)))
+                    cont[slot] = value
+                slot = _NO_KEY
+                if pos < end:
+                    if data[pos] != _V8_END_SPARSE:
+                        break
+                    _, pos = _v8_varint(data, pos + 1)
+                    _, pos = _v8_varint(data, pos)
+            else:
+                if types is not None and not (type(value) is dict
+                                              and type(value.get('type')) is str
+                                              and value['type'] in types):
+                    return None, pos
+                return value, pos
+            value = cont
+            kind, cont, slot = stack.pop()
+
+
+def _skip_v8(data: bytes, pos: int) -> int:
+    """Return the position just past the V8 value at pos, without building it."""
+    end = len(data)
+    depth = []          # frames: [kind, remaining count + 1 | expecting-key flag]
+    while True:
+        if pos >= end:
+            return end
+        tag = data[pos]
+        pos += 1
+        while tag in _V8_PREFIX_TAGS:
+            if tag != 0x00:
+                _, pos = _v8_varint(data, pos)
+            if pos >= end:
+                return pos
+            tag = data[pos]
+            pos += 1
+        if tag == 0x22 or tag == 0x53:
+            n, pos = _v8_varint(data, pos)
+            pos += n
+        elif tag == 0x63:
+            n, pos = _v8_varint(data, pos)
+            pos += n * 2
+        elif tag == _V8_OBJECT:
+            depth.append([_V8_OBJECT, False])
+        elif tag == _V8_DENSE:
+            n, pos = _v8_varint(data, pos)
+            depth.append([_V8_DENSE, n + 1])
+        elif tag == _V8_SPARSE:
+            _, pos = _v8_varint(data, pos)
+            depth.append([_V8_SPARSE, False])
+        elif tag is not None:
+            _, pos = _V8_SCALARS[tag](data, pos)
+        # Account for the value just skipped (a fresh container counts once it closes).
+        while depth:
+            frame = depth[-1]
+            if frame[0] == _V8_DENSE:
+                frame[1] -= 1
+                if frame[1]:
+                    break
+                if pos < end and data[pos] == _V8_END_DENSE:
+                    _, pos = _v8_varint(data, pos + 1)
+                    _, pos = _v8_varint(data, pos)
+            else:
+                frame[1] = not frame[1]
+                if not frame[1]:
+                    break
+                if pos >= end:
+                    return end
+                if data[pos] != (_V8_END_OBJECT if frame[0] == _V8_OBJECT else _V8_END_SPARSE):
+                    break
+                _, pos = _v8_varint(data, pos + 1)
+                if frame[0] == _V8_SPARSE:
+                    _, pos = _v8_varint(data, pos)
+            depth.pop()
+        else:
+            return pos
+
+
+def _v8_top_fields(data: bytes, pos: int, names: frozenset) -> dict | None:
+    """Read only the named top-level fields of a V8 object, skipping the rest.
+
+    Returns None when the value at pos is not an object. Stops as soon as every
+    name has been seen, so fields stored early in a record are found without
+    touching the remainder of it.
+    """
+    end = len(data)
+    while pos < end and data[pos] in _V8_PREFIX_TAGS:
+        tag = data[pos]
+        pos += 1
+        if tag != 0x00:
+            _, pos = _v8_varint(data, pos)
+    if pos >= end or data[pos] != _V8_OBJECT:
+        return None
+    pos += 1
+    found = {}
+    while pos < end and data[pos] != _V8_END_OBJECT and len(found) < len(names):
+        key, pos = _decode_v8(data, pos)
+        if pos >= end:
+            break
+        if key in names:
+            found[key], pos = _decode_v8(data, pos)
+        else:
+            pos = _skip_v8(data, pos)
+    return found
 
 
 def _find_v8_start(data: bytes) -> int:
@@ -223,186 +822,1110 @@ def _find_v8_start(data: bytes) -> int:
     return -1
 
 
+# ---------------------------------------------------------------------------
+# IndexedDB key layout (Chromium indexed_db_leveldb_coding)
+# ---------------------------------------------------------------------------
+
+_IDB_DATABASE_NAME = 201        # global metadata: origin + name -> database id
+_IDB_OBJECT_STORE_META = 50     # database metadata: object store id + field
+_IDB_OBJECT_STORE_DATA = 1      # index id reserved for object store records
+_IDB_TRAILER_OFFSET_TAG = 0xFE  # Blink envelope: 8-byte offset + 4-byte size
+
+
+def _idb_key_prefix(db_id: int, os_id: int, index_id: int) -> bytes:
+    """Encode an IndexedDB KeyPrefix: a length byte, then little-endian ids."""
+    a = db_id.to_bytes(max(1, (db_id.bit_length() + 7) // 8), 'little')
+    b = os_id.to_bytes(max(1, (os_id.bit_length() + 7) // 8), 'little')
+    c = index_id.to_bytes(max(1, (index_id.bit_length() + 7) // 8), 'little')
+    return bytes(((len(a) - 1) << 5 | (len(b) - 1) << 2 | (len(c) - 1),)) + a + b + c
+
+
+def _idb_parse_prefix(key: bytes) -> tuple[int, int, int, int] | None:
+    """Decode a KeyPrefix into (database id, object store id, index id, length)."""
+    if not key:
+        return None
+    head = key[0]
+    na, nb, nc = (head >> 5) + 1, ((head >> 2) & 0x07) + 1, (head & 0x03) + 1
+    end = 1 + na + nb + nc
+    if len(key) < end:
+        return None
+    return (int.from_bytes(key[1:1 + na], 'little'),
+            int.from_bytes(key[1 + na:1 + na + nb], 'little'),
+            int.from_bytes(key[1 + na + nb:end], 'little'), end)
+
+
+def _idb_data_prefixes(db) -> list[bytes] | None:
+    """Key prefixes of every object store's record range, read from IDB metadata.
+
+    Returns None when the ranges cannot be trusted for a prefix scan: no
+    metadata was found, or an id needs more than one byte, where the bytewise
+    comparator no longer orders keys like Chrome's `idb_cmp1`.
+    """
+    db_ids = set()
+    for value in db.iterator(prefix=_idb_key_prefix(0, 0, 0) + bytes((_IDB_DATABASE_NAME,)),
+                             include_key=False):
+        db_ids.add(int.from_bytes(value, 'little'))
+    prefixes = []
+    for db_id in sorted(db_ids):
+        if not 0 < db_id < 256:
+            return None
+        os_ids = set()
+        meta = _idb_key_prefix(db_id, 0, 0) + bytes((_IDB_OBJECT_STORE_META,))
+        for key in db.iterator(prefix=meta, include_value=False):
+            os_ids.add(_v8_varint(key, len(meta))[0])
+        for os_id in sorted(os_ids):
+            if not 0 < os_id < 256:
+                return None
+            prefixes.append(_idb_key_prefix(db_id, os_id, _IDB_OBJECT_STORE_DATA))
+    return prefixes or None
+
+
+def _idb_v8_offset(value: bytes) -> int:
+    """Offset of the V8 header in an object store record value, or -1.
+
+    Records are a varint schema version, the Blink envelope (`FF <version>`,
+    plus a trailer-offset field from version 21), then the V8 `FF <version>`
+    header. Values that do not match fall back to `_find_v8_start`.
+    """
+    _, pos = _v8_varint(value, 0)
+    if value[pos:pos + 1] == b'\xff':
+        _, pos = _v8_varint(value, pos + 1)
+        if value[pos:pos + 1] == bytes((_IDB_TRAILER_OFFSET_TAG,)):
+            pos += 13
+        if value[pos:pos + 1] == b'\xff':
+            return pos
+    return _find_v8_start(value)
+
+
+# ---------------------------------------------------------------------------
+# Extraction cache
+# ---------------------------------------------------------------------------
+
+CACHE_VERSION = 2
+CACHE_CHUNK_ROWS = 65_536
+_CATEGORY_COLUMNS = (0, 1, 2, 4, 7)     # Profile, Source, Group, Color, Transition
+_make_row = partial(tuple.__new__, Row)
+_make_visit_row = partial(tuple.__new__, VisitRow)
+_RECORD_LENGTH = struct.Struct('<Q')
+
+
+def _write_record(f, obj) -> None:
+    data = marshal.dumps(obj)
+    f.write(_RECORD_LENGTH.pack(len(data)))
+    f.write(data)
+
+
+def _read_record(f):
+    """Read one length-prefixed marshal record (whole, then `loads`: much faster
+    than `marshal.load` on a file, which reads object by object)."""
+    header = f.read(_RECORD_LENGTH.size)
+    if not header:
+        raise EOFError
+    if len(header) != _RECORD_LENGTH.size:
+        raise ValueError('truncated cache record')
+    (size,) = _RECORD_LENGTH.unpack(header)
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError('truncated cache record')
+    try:
+        return marshal.loads(data)
+    except EOFError:
+        raise ValueError('corrupt cache record') from None
+
+
+def _stat_fingerprint(*paths: Path) -> tuple:
+    """(name, size, mtime_ns) for each path; missing files are (name, None, None)."""
+    result = []
+    for path in paths:
+        try:
+            info = path.stat()
+            result.append((path.name, info.st_size, info.st_mtime_ns))
+        except OSError:
+            result.append((path.name, None, None))
+    return tuple(result)
+
+
+def _leveldb_fingerprint(path: Path) -> tuple | None:
+    """Stat of every file in a LevelDB directory plus a hash of CURRENT and its MANIFEST.
+
+    The manifest names the live table files, so its hash catches a rewrite
+    that happens to keep every size and mtime.
+    """
+    try:
+        entries = sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                         for e in os.scandir(path) if e.name != 'LOCK' and e.is_file())
+    except OSError:
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        current = (path / 'CURRENT').read_bytes()
+        digest.update(current)
+        digest.update((path / current.decode('ascii', 'replace').strip()).read_bytes())
+    except OSError:
+        pass
+    return tuple(entries), digest.hexdigest()
+
+
+def onetab_leveldb_dirs(profile_dir: Path) -> tuple[Path, Path]:
+    """The legacy extension-settings LevelDB and the IndexedDB LevelDB of OneTab."""
+    return (profile_dir / 'Local Extension Settings' / ONETAB_EXTENSION_ID,
+            profile_dir / 'IndexedDB' / f'chrome-extension_{ONETAB_EXTENSION_ID}_0.indexeddb.leveldb')
+
+
+def source_fingerprint(source: str, profile_dir: Path):
+    """Cheap fingerprint of the files one source reads; it changes when they do."""
+    if source == 'bookmarks':
+        return _stat_fingerprint(profile_dir / 'Bookmarks')
+    if source == 'history':
+        return _stat_fingerprint(profile_dir / 'History', profile_dir / 'History-wal',
+                                 profile_dir / 'History-journal')
+    if source == 'onetab':
+        return tuple(map(_leveldb_fingerprint, onetab_leveldb_dirs(profile_dir)))
+    raise ValueError(f'Unknown source: {source!r}')
+
+
+def _encode_chunk(rows: list[Row]) -> tuple:
+    """Column-oriented, marshal-friendly form of a chunk of rows.
+
+    Low-cardinality columns become (values, uint32 codes); dates become int64s.
+    """
+    columns = list(zip(*rows))
+    encoded = []
+    for i, column in enumerate(columns):
+        if i in _CATEGORY_COLUMNS:
+            index: dict[str, int] = {}
+            codes = array('I', [index.setdefault(v, len(index)) for v in column])
+            encoded.append((list(index), codes.tobytes()))
+        elif i == 3:
+            encoded.append(array('q', column).tobytes())
+        else:
+            encoded.append(list(column))
+    return tuple(encoded)
+
+
+def _check_chunk(chunk) -> None:
+    """Raise ValueError unless `chunk` has the shape `_encode_chunk` gives it."""
+    if type(chunk) is not tuple or len(chunk) not in (len(CSV_FIELDS),
+                                                      len(CSV_FIELDS) + len(VISIT_FIELDS)):
+        raise ValueError('malformed cache chunk')
+    if type(chunk[3]) is not bytes or len(chunk[3]) % 8:
+        raise ValueError('malformed cache chunk dates')
+    count = len(chunk[3]) // 8
+    for i, column in enumerate(chunk):
+        if i in _CATEGORY_COLUMNS:
+            values, codes = column
+            if type(codes) is not bytes or len(codes) != 4 * count or (
+                    count and max(array('I', codes)) >= len(values)):
+                raise ValueError('malformed cache chunk codes')
+        elif i != 3 and (type(column) is not list or len(column) != count):
+            raise ValueError('malformed cache chunk column')
+
+
+def _decode_chunk(chunk: tuple) -> Iterator[Row | VisitRow]:
+    columns = []
+    for i, column in enumerate(chunk):
+        if i in _CATEGORY_COLUMNS:
+            values = [_intern(v) for v in column[0]]
+            codes = array('I')
+            codes.frombytes(column[1])
+            columns.append([values[c] for c in codes])
+        elif i == 3:
+            dates = array('q')
+            dates.frombytes(column)
+            columns.append(dates)
+        else:
+            columns.append(column)
+    return map(_make_row if len(columns) == len(CSV_FIELDS) else _make_visit_row, zip(*columns))
+
+
+class ExtractionCache:
+    """On-disk cache of extracted rows, one file per profile x source unit.
+
+    An entry is keyed by the unit (source, profile, extractor parameters,
+    timezone) and stores a fingerprint of its inputs; it is used only while the
+    fingerprint still matches, so a changed `Bookmarks`, `History` or OneTab
+    LevelDB is re-extracted. Rows are stored as marshal-encoded column chunks.
+    Entries are evicted least-recently-used first once the directory exceeds
+    `max_bytes` (see `evict`). Plain attributes only, so it pickles to workers.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 256 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, source: str, profile_dir: Path, profile_name: str, params: dict) -> Path:
+        key = repr((CACHE_VERSION, source, str(profile_dir), profile_name,
+                    sorted(params.items()), time.timezone, time.altzone, time.daylight))
+        return self.directory / f'{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.rows'
+
+    @staticmethod
+    def _read_chunks(f) -> list[tuple]:
+        """Every chunk left in an entry, each checked with `_check_chunk`.
+
+        Raises ValueError (or TypeError) on a truncated or malformed entry.
+        """
+        chunks = []
+        while True:
+            try:
+                chunk = _read_record(f)
+            except EOFError:
+                return chunks
+            _check_chunk(chunk)
+            chunks.append(chunk)
+
+    @staticmethod
+    def _open_entry(path: Path, fingerprint):
+        """The entry file positioned after its header if it matches `fingerprint`, else None."""
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return None
+        try:
+            if _read_record(f) == fingerprint:
+                return f
+        except (EOFError, ValueError, TypeError, struct.error):
+            pass
+        f.close()
+        return None
+
+    def fresh(self, source: str, profile_dir: Path, profile_name: str, params: dict,
+              fingerprint) -> bool:
+        """True if `rows` would be served from the cache."""
+        f = self._open_entry(self._path(source, profile_dir, profile_name, params), fingerprint)
+        if f is None:
+            return False
+        f.close()
+        return True
+
+    def rows(self, source: str, profile_dir: Path, profile_name: str, params: dict,
+             fingerprint, produce) -> Iterator[Row]:
+        """Yield the cached rows of a unit, or `produce()` them and store them.
+
+        Rows are only stored when extraction ran to the end without errors. A
+        hit reads and checks the whole entry before yielding its first row; a
+        corrupt entry is deleted and the unit extracted again.
+        """
+        path = self._path(source, profile_dir, profile_name, params)
+        f = self._open_entry(path, fingerprint)
+        if f is not None:
+            try:
+                with f:
+                    chunks = self._read_chunks(f)
+            except (ValueError, TypeError) as e:
+                console.print(f'[yellow]Cache entry for {profile_name} {source} is unreadable '
+                              f'({e}); extracting it again.[/yellow]')
+                path.unlink(missing_ok=True)
+            else:
+                os.utime(path)      # mark as recently used
+                console.print(f'  [dim]{profile_name} {source} unchanged, read from cache[/dim]')
+                _record(cache_hits=1)
+                for chunk in chunks:
+                    yield from _decode_chunk(chunk)
+                return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        stats = new_stats()
+        complete = False
+        try:
+            with open(tmp_path, 'wb') as f:
+                _write_record(f, fingerprint)
+                chunk = []
+                for row in _with_stats(produce(), stats):
+                    chunk.append(row)
+                    if len(chunk) >= CACHE_CHUNK_ROWS:
+                        _write_record(f, _encode_chunk(chunk))
+                        chunk = []
+                    yield row
+                if chunk:
+                    _write_record(f, _encode_chunk(chunk))
+            complete = True
+        finally:
+            # Hand the extractor's own counters to the enclosing unit.
+            _record(**{k: stats[k] for k in METRIC_FIELDS if k not in ('seconds', 'rows')})
+            if complete and not stats['errors']:
+                os.replace(tmp_path, path)
+            else:
+                tmp_path.unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """Delete least-recently-used entries until the cache fits `max_bytes`.
+
+        Returns the number of bytes freed.
+        """
+        try:
+            entries = [(e.stat().st_mtime_ns, e.stat().st_size, e.path)
+                       for e in os.scandir(self.directory) if e.name.endswith('.rows')]
+        except OSError:
+            return 0
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                freed += size
+            except OSError:
+                pass
+        return freed
+
+
+# ---------------------------------------------------------------------------
+# Row filters (--since, --until, --domain)
+# ---------------------------------------------------------------------------
+
+_AGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+
+class Instant(int):
+    """A --since/--until bound that is a real moment (an age, or a date with a
+    UTC offset): Unix microseconds, turned into each source's own wall clock
+    by `RowFilter.on_clock`."""
+    __slots__ = ()
+
+
+def parse_when(text: str) -> int:
+    """argparse type for --since/--until: 'YYYY-MM-DD[ HH:MM[:SS]]', or an age
+    such as '30d' or '12h' (s, m, h, d, w) before now. A plain date is pipeline
+    microseconds, compared with dates as exported; an age or a date with a UTC
+    offset is an `Instant`. Whole seconds, so they compare exactly with extracted
+    dates."""
+    text = text.strip()
+    age = re.fullmatch(r'(\d+)\s*([smhdw])', text)
+    if age:
+        return Instant(int(time.time()) * 1_000_000 - int(age[1]) * _AGE_UNITS[age[2]] * 1_000_000)
+    try:
+        when = datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'expected YYYY-MM-DD[ HH:MM[:SS]] or an age like 30d, got {text!r}') from None
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+        return Instant((when.replace(microsecond=0) - UNIX_EPOCH) // timedelta(microseconds=1))
+    return (when.replace(microsecond=0) - UNIX_EPOCH) // timedelta(microseconds=1)
+
+
+def wall_clock(us: int | None, clock: str) -> int | None:
+    """A bound in the wall clock a source exports its dates in: 'utc' (History,
+    Bookmarks) or 'local' (OneTab). Only `Instant`s change."""
+    if type(us) is not Instant:
+        return us
+    if clock == 'local':
+        return int(us) + time.localtime(us // 1_000_000).tm_gmtoff * 1_000_000
+    return int(us)
+
+
+def url_host(url: str) -> str:
+    try:
+        return urlsplit(url).hostname or ''
+    except ValueError:
+        return ''
+
+
+class RowFilter:
+    """Keep rows dated in [since, until) whose URL host is in `domains`.
+
+    Dates are compared as exported (pipeline microseconds, before minute
+    rounding); undated rows are dropped once either bound is set. `Instant`
+    bounds must first be put on the source's clock with `on_clock`, which each
+    extractor does. A domain matches its subdomains too. Extractors push the
+    filter down as far as their source allows and call `keeps` for the final
+    say on each row.
+    """
+
+    def __init__(self, since: int | None = None, until: int | None = None,
+                 domains: Iterable[str] = ()):
+        self.since = since
+        self.until = until
+        self.domains = tuple(sorted({d.strip().lower().lstrip('*.').rstrip('/')
+                                     for d in domains} - {''}))
+
+    def on_clock(self, clock: str) -> 'RowFilter':
+        """This filter with its `Instant` bounds on `clock` (see `wall_clock`)."""
+        if type(self.since) is not Instant and type(self.until) is not Instant:
+            return self
+        return RowFilter(wall_clock(self.since, clock), wall_clock(self.until, clock),
+                         self.domains)
+
+    def keeps_date(self, us: int) -> bool:
+        if self.since is None and self.until is None:
+            return True
+        return (us != NO_DATE and (self.since is None or us >= self.since)
+                and (self.until is None or us < self.until))
+
+    def keeps_url(self, url: str) -> bool:
+        if not self.domains:
+            return True
+        lowered = url.lower()
+        if not any(domain in lowered for domain in self.domains):
+            return False
+        host = url_host(url)
+        return any(host == domain or host.endswith('.' + domain) for domain in self.domains)
+
+    def keeps(self, us: int, url: str) -> bool:
+        return self.keeps_date(us) and self.keeps_url(url)
+
+    def apply(self, rows: Iterable[Row]) -> Iterator[Row]:
+        return (row for row in rows if self.keeps(row.Date, row.URL))
+
+    def history_where(self, time_column: str = 'last_visit_time',
+                      url_column: str = 'url') -> tuple[list[str], list]:
+        """SQL conditions on a History query that every kept row meets."""
+        conditions, params = [], []
+        if self.since is not None:
+            conditions.append(f'{time_column} >= ?')
+            params.append(self.since + CHROME_EPOCH_OFFSET_US)
+        if self.until is not None:
+            conditions.append(f'{time_column} < ?')
+            params.append(self.until + CHROME_EPOCH_OFFSET_US)
+        if self.domains:
+            conditions.append('(' + ' OR '.join([f'instr(lower({url_column}), ?) > 0']
+                                                * len(self.domains)) + ')')
+            params.extend(self.domains)
+        return conditions, params
+
+
+def row_filter_from_args(args: argparse.Namespace) -> RowFilter | None:
+    if args.since is None and args.until is None and not args.domain:
+        return None
+    return RowFilter(args.since, args.until, args.domain or ())
+
+
+def _cached_rows(cache: ExtractionCache, source: str, profile_dir: Path, profile_name: str,
+                 params: dict, produce, row_filter: RowFilter | None) -> Iterator[Row] | None:
+    """A unit's rows through the extraction cache, or None if the extractor
+    should read the source itself.
+
+    The cache only holds unfiltered rows. A filtered run filters a fresh entry;
+    without one it reads the source with the filter pushed down and leaves the
+    cache alone, so narrow exports neither pay for nor evict full extractions.
+    """
+    fingerprint = source_fingerprint(source, profile_dir)
+    if row_filter is not None and not cache.fresh(source, profile_dir, profile_name,
+                                                  params, fingerprint):
+        return None
+    rows = cache.rows(source, profile_dir, profile_name, params, fingerprint, produce)
+    return rows if row_filter is None else row_filter.apply(rows)
+
+
+# ---------------------------------------------------------------------------
+# Shared resources (library sessions)
+# ---------------------------------------------------------------------------
+
+def _idb_bytewise(a: bytes, b: bytes) -> int:
+    return (a > b) - (a < b)
+
+
+class ResourcePool:
+    """Open History connections, OneTab LevelDB snapshots and parsed JSON files
+    kept between extractions, so a long-lived `Extractor` opens each once.
+
+    Passed to the extractors as the `resources` unit option. Every lookup
+    re-checks the source's fingerprint (as the extraction cache does); an
+    entry whose files changed is closed, its temp copy removed, and reopened.
+    Handles stay in this process, so units using a pool run serially.
+    """
+
+    def __init__(self, keep_tmp: bool = False):
+        self.keep_tmp = keep_tmp
+        self._entries: dict[tuple, tuple] = {}      # key -> (fingerprint, value, close)
+
+    def _get(self, key: tuple, fingerprint, open_, close) -> tuple[object, bool]:
+        """(value, opened now) for `key`, reopening it if `fingerprint` moved."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] == fingerprint:
+                return entry[1], False
+            self._discard(key)
+        value = open_()
+        self._entries[key] = (fingerprint, value, close)
+        return value, True
+
+    def _discard(self, key: tuple) -> None:
+        _, value, close = self._entries.pop(key)
+        try:
+            close(value)
+        except Exception:
+            pass
+
+    def history(self, history_path: Path, tmp_history: Path,
+                access: str) -> tuple[sqlite3.Connection, str, int]:
+        """Like `open_history_db`; a reused connection reports 0 bytes copied."""
+        fingerprint = _stat_fingerprint(*(history_path.with_name(history_path.name + suffix)
+                                          for suffix in ('', '-wal', '-journal')))
+
+        def close(opened):
+            opened[0].close()
+            _remove_history_copy(tmp_history, self.keep_tmp)
+
+        (conn, used, copied), opened = self._get(
+            ('history', history_path, tmp_history, access), fingerprint,
+            partial(open_history_db, history_path, tmp_history, access), close)
+        return (conn, used, copied) if opened else (conn, f'{used} (reused)', 0)
+
+    def leveldb(self, src: Path, tmp_db: Path, **options) -> tuple[object, int]:
+        """An open plyvel DB on a snapshot of `src`, and the bytes copied for it."""
+        import plyvel
+
+        def open_():
+            copied = snapshot_leveldb(src, tmp_db)
+            try:
+                return plyvel.DB(str(tmp_db), create_if_missing=False, **options), copied
+            except Exception:
+                shutil.rmtree(tmp_db, ignore_errors=True)
+                raise
+
+        def close(opened):
+            opened[0].close()
+            if not self.keep_tmp:
+                shutil.rmtree(tmp_db, ignore_errors=True)
+
+        (db, copied), opened = self._get(('leveldb', src, tmp_db), _leveldb_fingerprint(src),
+                                         open_, close)
+        return db, copied if opened else 0
+
+    def json(self, path: Path):
+        """`read_json(path)`, parsed again only after the file changes."""
+        return self._get(('json', path), _stat_fingerprint(path), partial(read_json, path),
+                         lambda value: None)[0]
+
+    def close(self) -> None:
+        for key in list(self._entries):
+            self._discard(key)
+
+
 # ---------------------------------------------------------------------------
 # Extractors
 # ---------------------------------------------------------------------------
 
-def extract_bookmarks(profile_dir: Path, profile_name: str) -> list[dict]:
+def extract_bookmarks(profile_dir: Path, profile_name: str,
+                      cache: ExtractionCache | None = None,
+                      row_filter: RowFilter | None = None,
+                      resources: ResourcePool | None = None) -> Iterator[Row]:
+    if row_filter is not None:
+        row_filter = row_filter.on_clock('utc')
+    if cache is not None:
+        rows = _cached_rows(cache, 'bookmarks', profile_dir, profile_name, {},
+                            partial(extract_bookmarks, profile_dir, profile_name,
+                                    resources=resources), row_filter)
+        if rows is not None:
+            yield from rows
+            return
     bookmarks_path = profile_dir / 'Bookmarks'
     if not bookmarks_path.exists():
-        return []
+        return
     try:
-        with open(bookmarks_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_json(bookmarks_path) if resources is None else resources.json(bookmarks_path)
     except Exception as e:
         console.print(f'[yellow]Could not read bookmarks for {profile_name!r}: {e}[/yellow]')
-        return []
+        _record(errors=1)
+        return
+
+    rows = walk_bookmarks(data.get('roots', {}), sys.intern(profile_name))
+    yield from rows if row_filter is None else row_filter.apply(rows)
 
-    tabs = []
 
-    def walk(node: dict, folder: str) -> None:
-        if node.get('type') == 'url':
-            tabs.append({
-                'Profile': profile_name,
-                'Source': 'Bookmark',
-                'Group': folder,
-                'Date': chrome_time_to_str(int(node.get('date_added', 0))),
-                'Color': '',
-                'Title': node.get('name', 'No Title'),
-                'URL': node.get('url', ''),
-            })
-        elif node.get('type') == 'folder':
-            child_folder = f"{folder}/{node['name']}" if folder else node['name']
-            for child in node.get('children', []):
-                walk(child, child_folder)
-
-    ROOT_LABELS = {
-        'bookmark_bar': 'Bookmarks Bar',
-        'other': 'Other Bookmarks',
-        'synced': 'Mobile Bookmarks',
-    }
-    for root_key, root_node in data.get('roots', {}).items():
-        if isinstance(root_node, dict):
-            walk(root_node, ROOT_LABELS.get(root_key, root_key))
-
-    return tabs
+BOOKMARK_ROOT_LABELS = {
+    'bookmark_bar': 'Bookmarks Bar',
+    'other': 'Other Bookmarks',
+    'synced': 'Mobile Bookmarks',
+}
+
+
+def walk_bookmarks(roots: dict, profile_name: str) -> Iterator[Row]:
+    """Yield Bookmark rows from a Bookmarks `roots` dict in document order.
+
+    Iterative depth-first walk: the stack holds one (children iterator, folder
+    path) pair per open folder, so each path is built and interned once and
+    arbitrarily deep folder trees cost neither recursion depth nor a chain of
+    nested generators per row.
+    """
+    row, to_micros, intern = Row, chrome_time_to_micros, sys.intern
+    for root_key, root_node in roots.items():
+        if not isinstance(root_node, dict):
+            continue
+        stack = [(iter((root_node,)), BOOKMARK_ROOT_LABELS.get(root_key, root_key))]
+        while stack:
+            nodes, folder = stack[-1]
+            for node in nodes:
+                kind = node.get('type')
+                if kind == 'url':
+                    yield row(profile_name, 'Bookmark', folder,
+                              to_micros(int(node.get('date_added', 0))), '',
+                              node.get('name', 'No Title'), node.get('url', ''))
+                elif kind == 'folder':
+                    child_folder = intern(f"{folder}/{node['name']}" if folder else node['name'])
+                    stack.append((iter(node.get('children', [])), child_folder))
+                    break
+            else:
+                stack.pop()
+
+
+HISTORY_ACCESS_MODES = ('auto', 'immutable', 'backup', 'copy')
+
+
+def _format_bytes(n: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+    return f'{n:.1f} GB'
+
+
+def _sqlite_uri(db_path: Path, **params) -> str:
+    return f'{db_path.resolve().as_uri()}?{urlencode(params)}'
+
+
+def tmp_path(tmp_base: Path, kind: str, profile_name: str) -> Path:
+    """Temporary copy location of one profile's `kind` database under `tmp_base`."""
+    safe = profile_name.replace(' ', '_').replace('/', '_')
+    return tmp_base / f'tmp_{kind}_{safe}'
+
+
+def _copy_history(history_path: Path, tmp_history: Path) -> int:
+    """Copy History plus journal/WAL files for a consistent snapshot; returns bytes copied.
+
+    A file already copied with the same size and mtime (a prefetched or kept
+    copy) is left alone; side files that no longer exist are removed.
+    """
+    copied = 0
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        src = history_path.parent / (history_path.name + suffix)
+        dst = tmp_history.parent / (tmp_history.name + suffix)
+        try:
+            info = src.stat()
+        except FileNotFoundError:
+            if not suffix:
+                raise
+            dst.unlink(missing_ok=True)
+            continue
+        try:
+            existing = dst.stat()
+            if existing.st_size == info.st_size and existing.st_mtime_ns == info.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        shutil.copy2(src, dst)
+        copied += info.st_size
+    return copied
+
+
+def _remove_history_copy(tmp_history: Path, keep_tmp: bool) -> None:
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        p = tmp_history.parent / (tmp_history.name + suffix)
+        if not keep_tmp and p.exists():
+            p.unlink()
+
+
+def open_history_db(history_path: Path, tmp_history: Path,
+                    access: str = 'auto') -> tuple[sqlite3.Connection, str, int]:
+    """Open a readable snapshot of a History database.
+
+    Returns (connection, access path used, bytes copied). Access paths:
+      auto       open the live file with `mode=ro`, taking SQLite's normal read
+                 locks; backup when it is busy or locked (Chrome holds History
+                 exclusively while it runs), copy on any other error
+      immutable  open the live file read-only with `immutable=1` — no copy, no
+                 locks; opt-in only, since SQLite may return wrong rows or
+                 SQLITE_CORRUPT if the file changes while it is read
+      backup     SQLite online backup of the live file into an in-memory database
+      copy       copy the file plus journal/WAL into `tmp_history` (the old behaviour)
+    immutable and backup fall back to copy when the live file is locked or unreadable.
+    """
+    if access == 'auto':
+        try:
+            conn = sqlite3.connect(_sqlite_uri(history_path, mode='ro'), uri=True, timeout=1)
+            try:
+                conn.execute('SELECT 1 FROM urls LIMIT 1').fetchall()
+            except sqlite3.Error:
+                conn.close()
+                raise
+            return conn, 'read-only', 0
+        except sqlite3.Error as e:
+            if getattr(e, 'sqlite_errorcode', 0) & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED):
+                access = 'backup'
+            else:
+                console.print(f'[yellow]Read-only open of {history_path} failed ({e}); '
+                              f'copying.[/yellow]')
+    if access == 'immutable':
+        try:
+            conn = sqlite3.connect(_sqlite_uri(history_path, mode='ro', immutable=1), uri=True)
+            try:
+                conn.execute('SELECT 1 FROM urls LIMIT 1').fetchall()
+            except sqlite3.Error:
+                conn.close()
+                raise
+            return conn, 'immutable', 0
+        except sqlite3.Error as e:
+            console.print(f'[yellow]Immutable open of {history_path} failed ({e}); copying.[/yellow]')
+    elif access == 'backup':
+        try:
+            src = sqlite3.connect(_sqlite_uri(history_path, mode='ro'), uri=True, timeout=1,
+                                  isolation_level=None)
+            try:
+                # Take the read lock up front: Python's backup() retries a busy
+                # source forever, so a locked file must fail here instead.
+                src.execute('BEGIN')
+                src.execute('SELECT 1 FROM urls LIMIT 1').fetchall()
+                conn = sqlite3.connect(':memory:')
+                src.backup(conn)
+            finally:
+                src.close()
+            return conn, 'backup', 0
+        except sqlite3.Error as e:
+            console.print(f'[yellow]Backup of {history_path} failed ({e}); copying.[/yellow]')
+    copied = _copy_history(history_path, tmp_history)
+    return sqlite3.connect(str(tmp_history)), 'copy', copied
+
+
+HISTORY_FETCH_ROWS = 4096             # rows per fetchmany() batch
+HISTORY_MMAP_BYTES = 256 << 20        # PRAGMA mmap_size for file-backed History
+HISTORY_CACHE_KIB = 64 << 10          # PRAGMA cache_size (page cache per connection)
+
+
+def tune_history_db(conn: sqlite3.Connection) -> None:
+    """Read-only tuning: memory-map the file (a no-op for in-memory backups),
+    a larger page cache for the visits join, and refuse any write."""
+    conn.execute('PRAGMA query_only = ON')
+    conn.execute(f'PRAGMA mmap_size = {HISTORY_MMAP_BYTES}')
+    conn.execute(f'PRAGMA cache_size = -{HISTORY_CACHE_KIB}')
+
+
+def _fetch_batches(cursor: sqlite3.Cursor, size: int = HISTORY_FETCH_ROWS) -> Iterator[tuple]:
+    """A cursor's rows, fetched `size` at a time."""
+    while batch := cursor.fetchmany(size):
+        yield from batch
+
+
+# Chrome's PageTransition: core type in the low byte, qualifiers in the high bits.
+TRANSITION_TYPES = ('Link', 'Typed', 'Bookmark', 'Subframe (auto)', 'Subframe', 'Generated',
+                    'Start page', 'Form submit', 'Reload', 'Keyword', 'Keyword (generated)')
+_TRANSITION_FORWARD_BACK = 0x01000000
+_TRANSITION_REDIRECTS = 0x40000000 | 0x80000000     # client | server redirect
+
+
+@lru_cache(maxsize=None)
+def transition_label(transition: int) -> str:
+    """Label of a visit's transition, e.g. 'Typed' or 'Link (redirect)'."""
+    core = transition & 0xFF
+    label = TRANSITION_TYPES[core] if core < len(TRANSITION_TYPES) else f'Transition {core}'
+    if transition & _TRANSITION_REDIRECTS:
+        label += ' (redirect)'
+    elif transition & _TRANSITION_FORWARD_BACK:
+        label += ' (back/forward)'
+    return sys.intern(label)
 
 
 def extract_history(profile_dir: Path, profile_name: str,
-                    tmp_base: Path, keep_tmp: bool) -> list[dict]:
+                    tmp_base: Path, keep_tmp: bool, since: int = 0,
+                    access: str = 'auto', visits: bool = False,
+                    cache: ExtractionCache | None = None,
+                    row_filter: RowFilter | None = None,
+                    resources: ResourcePool | None = None,
+                    checkpoint: bool = False) -> Iterator[Row | VisitRow]:
+    """Stream History rows most-recent-first from the SQLite cursor.
+
+    One row per URL, dated by its last visit; with `visits`, one `VisitRow` per
+    visit (`visits` joined to `urls`), dated by the visit and carrying its
+    transition, its URL's visit and typed counts and its duration. With
+    `since` (a Chrome timestamp), only visits after it are returned. `access`
+    picks how the database is opened; see `open_history_db`.
+    `row_filter` becomes WHERE conditions, so SQLite skips the rows it drops.
+    With `resources`, the connection is taken from and left open in the pool.
+    With `checkpoint`, the raw Chrome time of the newest row read is recorded
+    as the unit's `checkpoint` counter, for the next incremental run.
+    """
+    if row_filter is not None:
+        row_filter = row_filter.on_clock('utc')
     history_path = profile_dir / 'History'
+    params = _cache_params('history', {'since': since, 'visits': visits,
+                                       'checkpoint': checkpoint})
+    if cache is not None and params is not None:
+        rows = _cached_rows(cache, 'history', profile_dir, profile_name, params,
+                            partial(extract_history, profile_dir, profile_name, tmp_base,
+                                    keep_tmp, since, access, visits, resources=resources),
+                            row_filter)
+        if rows is not None:
+            yield from rows
+            return
     if not history_path.exists():
-        return []
+        return
 
-    safe = profile_name.replace(' ', '_').replace('/', '_')
-    tmp_history = tmp_base / f'tmp_history_{safe}'
+    tmp_history = tmp_path(tmp_base, 'history', profile_name)
 
     try:
-        shutil.copy2(history_path, tmp_history)
-        # Copy journal/WAL files so SQLite sees a consistent snapshot
-        for suffix in ('-journal', '-wal', '-shm'):
-            src = history_path.parent / (history_path.name + suffix)
-            if src.exists():
-                shutil.copy2(src, tmp_history.parent / (tmp_history.name + suffix))
+        start = time.perf_counter()
+        if resources is None:
+            conn, used, copied = open_history_db(history_path, tmp_history, access)
+        else:
+            conn, used, copied = resources.history(history_path, tmp_history, access)
+        _record(copy_seconds=time.perf_counter() - start, bytes_copied=copied)
     except Exception as e:
         console.print(f'[bold red]Error copying History for {profile_name!r}:[/bold red] {e}')
-        return []
+        _record(errors=1)
+        if resources is None:
+            _remove_history_copy(tmp_history, keep_tmp)
+        return
+    console.print(f'  [dim]{profile_name} history via {used} ({_format_bytes(copied)} copied)[/dim]')
 
-    tabs = []
+    profile_name = sys.intern(profile_name)
     try:
-        conn = sqlite3.connect(str(tmp_history))
-        rows = conn.execute(
-            'SELECT title, url, last_visit_time FROM urls ORDER BY last_visit_time DESC'
-        ).fetchall()
-        conn.close()
-        for title, url, last_visit in rows:
-            tabs.append({
-                'Profile': profile_name,
-                'Source': 'History',
-                'Group': '',
-                'Date': chrome_time_to_str(last_visit),
-                'Color': '',
-                'Title': title or 'No Title',
-                'URL': url or '',
-            })
+        tune_history_db(conn)
+        time_column, url_column = ('v.visit_time', 'u.url') if visits \
+            else ('last_visit_time', 'url')
+        conditions, params = row_filter.history_where(time_column, url_column) \
+            if row_filter else ([], [])
+        if since:
+            high = conn.execute('SELECT MAX(visit_time) FROM visits' if visits else
+                                'SELECT MAX(last_visit_time) FROM urls').fetchone()[0] or 0
+            if high < since:
+                console.print(f'[yellow]History for {profile_name!r} is older than the last '
+                              f'incremental checkpoint (cleared?). Run without --incremental '
+                              f'to rebuild it.[/yellow]')
+                return
+            conditions.insert(0, f'{time_column} > ?')
+            params.insert(0, since)
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        if visits:
+            # visits_time_index serves both the ORDER BY and any date range.
+            cursor = conn.execute(
+                f'SELECT u.title, u.url, v.visit_time, v.transition, u.visit_count, '
+                f'u.typed_count, v.visit_duration '
+                f'FROM visits v JOIN urls u ON u.id = v.url{where} '
+                f'ORDER BY v.visit_time DESC', params)
+        else:
+            cursor = conn.execute(
+                f'SELECT title, url, last_visit_time FROM urls{where} '
+                f'ORDER BY last_visit_time DESC', params)
+        fetched = _fetch_batches(cursor)
+        if checkpoint:
+            # Newest first: the first row's time, before it is truncated to the
+            # second, is exactly what the next run must start after.
+            first = next(fetched, None)
+            if first is None:
+                return
+            _record(checkpoint=first[2])
+            fetched = chain((first,), fetched)
+        if visits:
+            rows = (VisitRow(profile_name, 'History', '', chrome_time_to_micros(visit_time), '',
+                             title or 'No Title', url or '', transition_label(transition or 0),
+                             visit_count, typed_count, duration)
+                    for title, url, visit_time, transition, visit_count, typed_count, duration
+                    in fetched)
+        else:
+            rows = (Row(profile_name, 'History', '', chrome_time_to_micros(last_visit), '',
+                        title or 'No Title', url or '')
+                    for title, url, last_visit in fetched)
+        yield from rows if row_filter is None else row_filter.apply(rows)
     except Exception as e:
         console.print(f'[bold red]Error reading History for {profile_name!r}:[/bold red] {e}')
+        _record(errors=1)
     finally:
-        for suffix in ('', '-journal', '-wal', '-shm'):
-            p = tmp_history.parent / (tmp_history.name + suffix)
-            if not keep_tmp and p.exists():
-                p.unlink()
+        if resources is None:
+            conn.close()
+            _remove_history_copy(tmp_history, keep_tmp)
+
+
+LEVELDB_TABLE_SUFFIXES = ('.ldb', '.sst')
 
-    return tabs
+
+def snapshot_leveldb(src: Path, dst: Path) -> int:
+    """Make `dst` an openable snapshot of the LevelDB directory `src`; returns bytes copied.
+
+    Table files (.ldb/.sst) are never modified once written, so they are
+    hard-linked (or left alone if `dst` already holds the same file) and only
+    fall back to a copy across filesystems. Only the small mutable files —
+    CURRENT, MANIFEST-*, LOG and the *.log journal — are copied; LOCK is
+    skipped. Files in `dst` that are gone from `src` are removed, so a snapshot
+    kept with --keep-tmp is refreshed rather than rebuilt.
+    """
+    dst.mkdir(parents=True, exist_ok=True)
+    copied = 0
+    wanted = set()
+    for entry in os.scandir(src):
+        if entry.name == 'LOCK' or not entry.is_file():
+            continue
+        wanted.add(entry.name)
+        target = dst / entry.name
+        info = entry.stat()
+        if entry.name.endswith(LEVELDB_TABLE_SUFFIXES):
+            try:
+                existing = target.stat()
+                if existing.st_size == info.st_size and existing.st_mtime_ns == info.st_mtime_ns:
+                    continue
+                target.unlink()
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(entry.path, target)
+                continue
+            except OSError:
+                pass
+        shutil.copy2(entry.path, target)
+        copied += info.st_size
+    for entry in os.scandir(dst):
+        if entry.name not in wanted and entry.is_file():
+            os.unlink(entry.path)
+    return copied
 
 
 def extract_onetab_legacy(profile_dir: Path, profile_name: str,
-                           tmp_base: Path, keep_tmp: bool) -> tuple[list[dict], bool]:
-    """Extract OneTab data from legacy LevelDB (Local Extension Settings)."""
+                           tmp_base: Path, keep_tmp: bool,
+                           row_filter: RowFilter | None = None,
+                           resources: ResourcePool | None = None) -> tuple[list[Row], bool]:
+    """Extract OneTab data from legacy LevelDB (Local Extension Settings).
+
+    Returns (rows, migrated). Tabs carry their group's date, so `row_filter`
+    skips whole groups out of range.
+    """
+    tabs, migrated, _ = _read_onetab_legacy(profile_dir, profile_name, tmp_base, keep_tmp,
+                                            row_filter, resources)
+    return tabs, migrated
+
+
+def _read_onetab_legacy(profile_dir: Path, profile_name: str, tmp_base: Path, keep_tmp: bool,
+                        row_filter: RowFilter | None,
+                        resources: ResourcePool | None) -> tuple[list[Row], bool, int]:
+    """`extract_onetab_legacy`, plus the number of tabs in the state before
+    filtering, which the dispatcher's IDB fallback decides on."""
+    if row_filter is not None:
+        row_filter = row_filter.on_clock('local')
     db_path = profile_dir / 'Local Extension Settings' / ONETAB_EXTENSION_ID
     if not db_path.exists():
-        return []
+        return [], False, 0
 
-    safe = profile_name.replace(' ', '_').replace('/', '_')
-    tmp_db = tmp_base / f'tmp_onetab_legacy_{safe}'
+    tmp_db = tmp_path(tmp_base, 'onetab_legacy', profile_name)
     try:
-        if tmp_db.exists():
-            shutil.rmtree(tmp_db)
-        shutil.copytree(db_path, tmp_db)
+        start = time.perf_counter()
+        if resources is None:
+            copied = snapshot_leveldb(db_path, tmp_db)
+        else:
+            db, copied = resources.leveldb(db_path, tmp_db)
+        _record(copy_seconds=time.perf_counter() - start, bytes_copied=copied)
     except Exception as e:
         console.print(f'[bold red]Error copying legacy OneTab for {profile_name!r}:[/bold red] {e}')
-        return []
+        _record(errors=1)
+        return [], False, 0
 
     tabs = []
     migrated = False
+    total = 0
     try:
-        db = plyvel.DB(str(tmp_db), create_if_missing=False)
+        if resources is None:
+            import plyvel
+            db = plyvel.DB(str(tmp_db), create_if_missing=False)
         raw_state = db.get(b'state')
         migrated = db.get(b'stateMigratedToIDB') is not None
-        db.close()
+        if resources is None:
+            db.close()
+        _record(keys_scanned=2)
 
         if not migrated and raw_state:
+            profile_name = sys.intern(profile_name)
             state_data = json.loads(json.loads(raw_state.decode('utf-8')))
             for group in state_data.get('tabGroups', []):
+                date_us = ms_epoch_to_micros(group.get('createDate'))
+                if row_filter is not None and not row_filter.keeps_date(date_us):
+                    total += len(group.get('tabsMeta', []))
+                    continue
                 label = group.get('label') or 'Untitled Group'
-                date_str = ms_epoch_to_str(group.get('createDate'))
-                color = group.get('color', '')
+                color = _intern(group.get('color', ''))
                 group_type = group.get('groupType', '')
-                group_label = f'{label} [{group_type}]' if group_type else label
+                group_label = _intern(f'{label} [{group_type}]' if group_type else label)
                 for tab in group.get('tabsMeta', []):
-                    tabs.append({
-                        'Profile': profile_name,
-                        'Source': 'OneTab',
-                        'Group': group_label,
-                        'Date': date_str,
-                        'Color': color,
-                        'Title': tab.get('title', 'No Title'),
-                        'URL': tab.get('url', ''),
-                    })
+                    url = tab.get('url', '')
+                    total += 1
+                    if row_filter is not None and not row_filter.keeps_url(url):
+                        continue
+                    tabs.append(Row(profile_name, 'OneTab', group_label, date_us, color,
+                                    tab.get('title', 'No Title'), url))
+            _record(records_decoded=len(state_data.get('tabGroups', [])))
     except Exception as e:
         console.print(f'[bold red]Error reading legacy OneTab for {profile_name!r}:[/bold red] {e}')
+        _record(errors=1)
     finally:
-        if not keep_tmp and tmp_db.exists():
+        if resources is None and not keep_tmp and tmp_db.exists():
             shutil.rmtree(tmp_db)
 
-    return tabs, migrated
+    return tabs, migrated, total
+
+
+ONETAB_TAB_FIELDS = frozenset(('type', 'createDate', 'url', 'title', 'parentIds'))
 
 
 def extract_onetab_idb(profile_dir: Path, profile_name: str,
-                        tmp_base: Path, keep_tmp: bool) -> list[dict]:
-    """Extract OneTab data from IndexedDB (newer OneTab versions)."""
+                        tmp_base: Path, keep_tmp: bool,
+                        row_filter: RowFilter | None = None,
+                        resources: ResourcePool | None = None) -> Iterator[Row]:
+    """Extract OneTab data from IndexedDB (newer OneTab versions).
+
+    With `row_filter`, only the fields a tab row needs are read from each
+    record (`_v8_top_fields`), and tabs out of range are dropped before
+    anything else is decoded; group records are still decoded in full.
+    """
+    if row_filter is not None:
+        row_filter = row_filter.on_clock('local')
     idb_dir = (profile_dir / 'IndexedDB' /
                f'chrome-extension_{ONETAB_EXTENSION_ID}_0.indexeddb.leveldb')
     if not idb_dir.exists():
-        return []
+        return
 
-    safe = profile_name.replace(' ', '_').replace('/', '_')
-    tmp_db = tmp_base / f'tmp_onetab_idb_{safe}'
+    tmp_db = tmp_path(tmp_base, 'onetab_idb', profile_name)
     try:
-        if tmp_db.exists():
-            shutil.rmtree(tmp_db)
-        shutil.copytree(idb_dir, tmp_db)
+        start = time.perf_counter()
+        if resources is None:
+            copied = snapshot_leveldb(idb_dir, tmp_db)
+        else:
+            db, copied = resources.leveldb(idb_dir, tmp_db, comparator=_idb_bytewise,
+                                           comparator_name=b'idb_cmp1')
+        _record(copy_seconds=time.perf_counter() - start, bytes_copied=copied)
     except Exception as e:
         console.print(f'[bold red]Error copying OneTab IDB for {profile_name!r}:[/bold red] {e}')
-        return []
+        _record(errors=1)
+        return
 
     groups: dict[str, dict] = {}   # id -> group record
     tab_records: list[dict] = []
 
     try:
-        def _bytewise(a, b): return (a > b) - (a < b)
-        db = plyvel.DB(str(tmp_db), create_if_missing=False,
-                       comparator=_bytewise, comparator_name=b'idb_cmp1')
-
-        for _, raw in db:
-            idx = _find_v8_start(raw)
+        if resources is None:
+            import plyvel
+            db = plyvel.DB(str(tmp_db), create_if_missing=False,
+                           comparator=_idb_bytewise, comparator_name=b'idb_cmp1')
+
+        prefixes = _idb_data_prefixes(db)
+        if prefixes is not None:
+            values = (raw for p in prefixes for raw in db.iterator(prefix=p, include_key=False))
+        else:
+            values = (raw for key, raw in db
+                      if (kp := _idb_parse_prefix(key)) and kp[2] == _IDB_OBJECT_STORE_DATA
+                      and kp[0] and kp[1])
+        scanned = 0
+        for raw in values:
+            scanned += 1
+            idx = _idb_v8_offset(raw)
             if idx == -1:
                 continue
             try:
-                obj, _ = _decode_v8(raw, idx)
+                if row_filter is None:
+                    obj, _ = _decode_v8(raw, idx, ONETAB_RECORD_TYPES)
+                else:
+                    obj = _v8_top_fields(raw, idx, ONETAB_TAB_FIELDS)
+                    if obj is None:
+                        continue
+                    if obj.get('type') == 'tab':
+                        url = obj.get('url', '')
+                        if not row_filter.keeps(ms_epoch_to_micros(obj.get('createDate')),
+                                                url if isinstance(url, str) else ''):
+                            continue
+                    elif obj.get('type') == 'group':
+                        obj, _ = _decode_v8(raw, idx, ONETAB_RECORD_TYPES)
+                    else:
+                        continue
             except Exception:
                 continue
-            if not isinstance(obj, dict):
+            if obj is None:
                 continue
             rec_type = obj.get('type')
             if rec_type == 'group':
@@ -410,14 +1933,17 @@ def extract_onetab_idb(profile_dir: Path, profile_name: str,
             elif rec_type == 'tab':
                 tab_records.append(obj)
 
-        db.close()
+        if resources is None:
+            db.close()
+        _record(keys_scanned=scanned, records_decoded=len(groups) + len(tab_records))
     except Exception as e:
         console.print(f'[yellow]Could not read OneTab IDB for {profile_name!r}: {e}[/yellow]')
+        _record(errors=1)
     finally:
-        if not keep_tmp and tmp_db.exists():
+        if resources is None and not keep_tmp and tmp_db.exists():
             shutil.rmtree(tmp_db)
 
-    tabs = []
+    profile_name = sys.intern(profile_name)
     for tab in tab_records:
         url = tab.get('url', '')
         if not isinstance(url, str) or not url.startswith('http'):
@@ -436,33 +1962,1355 @@ def extract_onetab_idb(profile_dir: Path, profile_name: str,
                 color = g.get('color', '')
                 break
 
-        tabs.append({
-            'Profile': profile_name,
-            'Source': 'OneTab',
-            'Group': group_label or 'OneTab',
-            'Date': ms_epoch_to_str(tab.get('createDate')),
-            'Color': color,
-            'Title': tab.get('title') or 'No Title',
-            'URL': url,
-        })
-
-    return tabs
+        yield Row(profile_name, 'OneTab', _intern(group_label or 'OneTab'),
+                  ms_epoch_to_micros(tab.get('createDate')), _intern(color),
+                  tab.get('title') or 'No Title', url)
 
 
 def extract_onetab(profile_dir: Path, profile_name: str,
-                   tmp_base: Path, keep_tmp: bool) -> list[dict]:
+                   tmp_base: Path, keep_tmp: bool,
+                   cache: ExtractionCache | None = None,
+                   row_filter: RowFilter | None = None,
+                   resources: ResourcePool | None = None) -> Iterator[Row]:
     """Dispatcher: tries legacy LevelDB first; falls back to IDB if migrated."""
-    result = extract_onetab_legacy(profile_dir, profile_name, tmp_base, keep_tmp)
-    tabs, migrated = result if isinstance(result, tuple) else (result, False)
-
-    if migrated or not tabs:
-        idb_tabs = extract_onetab_idb(profile_dir, profile_name, tmp_base, keep_tmp)
-        if idb_tabs:
-            return idb_tabs
-        elif migrated:
+    if row_filter is not None:
+        row_filter = row_filter.on_clock('local')
+    if cache is not None:
+        rows = _cached_rows(cache, 'onetab', profile_dir, profile_name, {},
+                            partial(extract_onetab, profile_dir, profile_name,
+                                    tmp_base, keep_tmp, resources=resources), row_filter)
+        if rows is not None:
+            yield from rows
+            return
+    tabs, migrated, total = _read_onetab_legacy(profile_dir, profile_name, tmp_base, keep_tmp,
+                                                row_filter, resources)
+
+    if migrated or not total:
+        found = False
+        for tab in extract_onetab_idb(profile_dir, profile_name, tmp_base, keep_tmp,
+                                      row_filter, resources):
+            found = True
+            yield tab
+        if found:
+            return
+        if migrated:
             console.print(f'[yellow]OneTab in {profile_name!r}: IDB found but no data decoded.[/yellow]')
 
-    return tabs
+    yield from tabs
+
+
+# ---------------------------------------------------------------------------
+# Instrumentation (--timings, --metrics-out)
+# ---------------------------------------------------------------------------
+
+METRIC_FIELDS = ('seconds', 'copy_seconds', 'bytes_copied', 'keys_scanned',
+                 'records_decoded', 'rows', 'errors', 'cache_hits')
+
+# Counters of the unit currently being pulled through `_timed`, or None when
+# instrumentation is off (then `_record` is a no-op).
+_current_stats: dict | None = None
+
+
+def new_stats(**labels) -> dict:
+    return {**labels, **dict.fromkeys(METRIC_FIELDS, 0)}
+
+
+def _record(**counters) -> None:
+    """Add to the counters of the unit being extracted, if instrumented."""
+    if _current_stats is not None:
+        for name, value in counters.items():
+            _current_stats[name] += value
+
+
+def _timed(rows: Iterable[Row], stats: dict) -> Iterator[Row]:
+    """Pass rows through, adding the time spent producing them to stats['seconds'].
+
+    Only time inside the wrapped iterator counts, so lazily interleaved runs
+    are each charged their own share. While it runs, `_record` targets `stats`.
+    """
+    global _current_stats
+    clock = time.perf_counter
+    rows = iter(rows)
+    while True:
+        outer, _current_stats = _current_stats, stats
+        start = clock()
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        finally:
+            stats['seconds'] += clock() - start
+            _current_stats = outer
+        stats['rows'] += 1
+        yield row
+
+
+def _with_stats(rows: Iterable[Row], stats: dict) -> Iterator[Row]:
+    """Like `_timed` without the clock: route `_record` calls into `stats`."""
+    global _current_stats
+    rows = iter(rows)
+    while True:
+        outer, _current_stats = _current_stats, stats
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        finally:
+            _current_stats = outer
+        yield row
+
+
+def stage_times(unit_stats: list[dict], parallel: bool, open_seconds: float,
+                inclusive: dict[str, float], total: float) -> dict[str, float]:
+    """Turn inclusive pipeline timings into exclusive per-stage seconds.
+
+    `inclusive` holds the time spent pulling rows out of the merge, rounding
+    and dedup wrappers. Serially, extraction runs inside `open_runs` (bookmarks,
+    OneTab) and inside the merge (History), so the sum of unit times is taken
+    out of both; with --jobs, extraction is the wall time of the worker pool.
+    """
+    extracted = sum(s['seconds'] for s in unit_stats)
+    merge, rounding, dedupe = inclusive['merge'], inclusive['round'], inclusive['dedupe']
+    if parallel:
+        extract, sort = open_seconds, merge
+    else:
+        extract, sort = extracted, open_seconds + merge - extracted
+    return {'extract': extract, 'sort': max(sort, 0.0), 'round': rounding - merge,
+            'dedupe': dedupe - rounding, 'write': total - open_seconds - dedupe,
+            'total': total}
+
+
+def print_timings(unit_stats: list[dict], stages: dict[str, float]) -> None:
+    from rich.table import Table
+    table = Table(title='Timings', expand=False)
+    table.add_column('Profile', style='white', max_width=24, overflow='fold')
+    table.add_column('Source', style='blue')
+    for column in ('Time', 'Copy', 'Copied', 'Keys', 'Records', 'Rows'):
+        table.add_column(column, justify='right')
+    for s in unit_stats:
+        source = f"{s['source']} [dim](cached)[/dim]" if s['cache_hits'] else s['source']
+        table.add_row(s['profile'], source, f"{s['seconds']:.3f}s",
+                      f"{s['copy_seconds']:.3f}s", _format_bytes(s['bytes_copied']),
+                      str(s['keys_scanned'] or ''), str(s['records_decoded'] or ''),
+                      str(s['rows']))
+    table.add_section()
+    for name, seconds in stages.items():
+        label = f'[bold]{name}[/bold]' if name == 'total' else name
+        table.add_row('', label, f'{seconds:.3f}s')
+    console.print(table)
+
+
+def write_metrics(path: Path, unit_stats: list[dict], stages: dict[str, float],
+                  **summary) -> None:
+    """Write the machine-readable metrics JSON (--metrics-out)."""
+    doc = {'version': 1, **summary,
+           'stages': {name: round(seconds, 6) for name, seconds in stages.items()},
+           'units': [{k: round(v, 6) if isinstance(v, float) else v for k, v in s.items()}
+                     for s in unit_stats]}
+    path.write_text(json.dumps(doc, indent=2) + '\n', encoding='utf-8')
+
+
+# ---------------------------------------------------------------------------
+# Extraction scheduling
+# ---------------------------------------------------------------------------
+
+SOURCES = ('bookmarks', 'history', 'onetab')
+SOURCE_LABELS = {
+    'bookmarks': 'bookmarks:',
+    'history': 'history:  ',
+    'onetab': 'onetab:   ',
+}
+
+SPILL_BATCH_ROWS = 5000
+MERGE_FAN_IN = 256      # most runs merged (and files held open) at once
+
+
+def build_units(profiles: list[tuple[Path, str]], sources: list[str],
+                tmp_base: Path, keep_tmp: bool,
+                options: dict[str, dict] | None = None) -> list[tuple]:
+    """Expand profiles into (source, profile_dir, profile_name, tmp_base, keep_tmp, kwargs) units.
+
+    `options` maps a source to extra keyword arguments for its extractor; each
+    unit gets its own copy so per-profile values can be filled in afterwards.
+    """
+    options = options or {}
+    return [(source, profile_dir, profile_name, tmp_base, keep_tmp, dict(options.get(source, {})))
+            for profile_dir, profile_name in profiles
+            for source in sources]
+
+
+def extract_unit(unit: tuple) -> Iterator[Row]:
+    """Run one profile x source extraction unit. Top-level so it can be pickled."""
+    source, profile_dir, profile_name, tmp_base, keep_tmp, kwargs = unit
+    if source == 'bookmarks':
+        return extract_bookmarks(profile_dir, profile_name, **kwargs)
+    if source == 'history':
+        return extract_history(profile_dir, profile_name, tmp_base, keep_tmp, **kwargs)
+    if source == 'onetab':
+        return extract_onetab(profile_dir, profile_name, tmp_base, keep_tmp, **kwargs)
+    raise ValueError(f'Unknown source: {source!r}')
+
+
+_NO_DATE_KEY = -(1 << 63)
+
+
+def date_sort_key(row: Row) -> int:
+    """Most-recent-first sort key; rows with no date sort to the end."""
+    return row.Date or _NO_DATE_KEY
+
+
+def sorted_run(source: str, rows: Iterable[Row]) -> Iterator[Row]:
+    """Return one unit's rows as a most-recent-first run.
+
+    History already streams in `last_visit_time DESC` order and passes straight
+    through; bookmarks and OneTab are small enough to sort in memory.
+    """
+    if source == 'history':
+        return iter(rows)
+    return iter(sorted(rows, key=date_sort_key, reverse=True))
+
+
+def spill_unit(unit: tuple, spill_dir: Path,
+               stats: dict | None = None) -> tuple[Path, int, dict | None]:
+    """Worker entry point: write one unit's sorted run to a spill file in batches.
+
+    With `stats`, the worker fills in its own copy and returns it.
+    """
+    rows = extract_unit(unit)
+    if stats is not None:
+        rows = _timed(rows, stats)
+    path, count = write_spill(sorted_run(unit[0], rows), spill_dir, f'{unit[0]}_')
+    return path, count, stats
+
+
+def write_spill(rows: Iterable[Row], spill_dir: Path, prefix: str) -> tuple[Path, int]:
+    """Pickle rows to a new spill file in SPILL_BATCH_ROWS batches; returns (path, rows)."""
+    fd, name = tempfile.mkstemp(prefix=prefix, suffix='.run', dir=spill_dir)
+    count = 0
+    with os.fdopen(fd, 'wb') as f:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= SPILL_BATCH_ROWS:
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+                count += len(batch)
+                batch = []
+        if batch:
+            pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+            count += len(batch)
+    return Path(name), count
+
+
+def read_spill(path: Path) -> Iterator[Row]:
+    """Stream a spill file back one batch at a time, deleting it once drained.
+
+    Unpickled strings are fresh objects, so the low-cardinality columns are
+    re-interned to keep sharing one object per distinct value.
+    """
+    intern = sys.intern
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    break
+                for row in batch:
+                    if len(row) != 7:
+                        yield _visit_row(row)
+                        continue
+                    profile, source, group, date, color, title, url = row
+                    yield Row(intern(profile), intern(source), _intern(group), date,
+                              _intern(color), title, url)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+PREFETCH_MIN_BYTES = 32 << 20     # below this, staging is not worth importing asyncio
+PREFETCH_READ_BYTES = 1 << 20
+
+
+def _cache_params(source: str, kwargs: dict) -> dict | None:
+    """Cache key parameters of a unit, or None when it bypasses the cache.
+
+    Incremental History reads are read directly: deltas start from a new
+    checkpoint on every run, so an entry for one would never be hit again,
+    and cached rows do not carry the raw time a checkpoint is taken from.
+    """
+    if source != 'history':
+        return {}
+    if kwargs.get('since') or kwargs.get('checkpoint'):
+        return None
+    return {'visits': True} if kwargs.get('visits') else {}
+
+
+def stage_inputs(unit: tuple) -> list[Path]:
+    """Files a unit's extraction reads, or [] when its rows will come from the cache."""
+    source, profile_dir, profile_name, _, _, kwargs = unit
+    cache = kwargs.get('cache')
+    params = _cache_params(source, kwargs)
+    if cache is not None and params is not None and cache.fresh(
+            source, profile_dir, profile_name, params, source_fingerprint(source, profile_dir)):
+        return []
+    if source == 'bookmarks':
+        paths = [profile_dir / 'Bookmarks']
+    elif source == 'history':
+        paths = [profile_dir / f'History{suffix}' for suffix in ('', '-journal', '-wal')]
+    else:
+        paths = [Path(entry.path) for db in onetab_leveldb_dirs(profile_dir) if db.is_dir()
+                 for entry in os.scandir(db) if entry.is_file() and entry.name != 'LOCK']
+    return [path for path in paths if path.is_file()]
+
+
+def _stage_tmp_paths(unit: tuple) -> list[Path]:
+    source, _, profile_name, tmp_base, _, _ = unit
+    if source == 'history':
+        tmp_history = tmp_path(tmp_base, 'history', profile_name)
+        return [tmp_history.with_name(tmp_history.name + suffix)
+                for suffix in ('', '-journal', '-wal', '-shm')]
+    if source == 'onetab':
+        return [tmp_path(tmp_base, kind, profile_name) for kind in ('onetab_legacy', 'onetab_idb')]
+    return []
+
+
+def stage_unit(unit: tuple) -> dict:
+    """Do a unit's blocking file I/O ahead of its decode; returns copy counters.
+
+    Files read in place (Bookmarks, History outside `copy` access) are read
+    once so they are in the page cache when the extractor opens them. A History
+    copy and the OneTab LevelDB snapshots are made at the extractor's own temp
+    paths, where `_copy_history` and `snapshot_leveldb` find them up to date.
+    Errors are left for the extractor to hit and report.
+    """
+    source, profile_dir, profile_name, tmp_base, _, kwargs = unit
+    start = time.perf_counter()
+    copied = 0
+    try:
+        inputs = stage_inputs(unit)
+        if source == 'history' and inputs and kwargs.get('access') == 'copy':
+            copied = _copy_history(profile_dir / 'History', tmp_path(tmp_base, 'history', profile_name))
+        elif source == 'onetab' and inputs:
+            for db, kind in zip(onetab_leveldb_dirs(profile_dir), ('onetab_legacy', 'onetab_idb')):
+                if db.is_dir():
+                    copied += snapshot_leveldb(db, tmp_path(tmp_base, kind, profile_name))
+        else:
+            buffer = bytearray(PREFETCH_READ_BYTES)
+            for path in inputs:
+                with open(path, 'rb', buffering=0) as f:
+                    while f.readinto(buffer):
+                        pass
+    except Exception:
+        pass
+    return {'copy_seconds': time.perf_counter() - start if copied else 0.0,
+            'bytes_copied': copied}
+
+
+class Prefetcher:
+    """Asyncio orchestrator that stages units' file I/O ahead of their decode.
+
+    An event loop in a background thread runs `stage_unit` for each unit, in
+    unit order, through `asyncio.to_thread`, with at most `limit` in flight so
+    a slow network home directory is not flooded. Staging runs at most `limit`
+    units ahead of the one being decoded, so staged copies do not pile up on
+    runs with many profiles. Decoding stays on the calling thread; `wait(i)`
+    blocks until unit i is staged.
+    """
+
+    def __init__(self, units: list[tuple], limit: int):
+        import asyncio
+        import threading
+        self.units = units
+        self.limit = limit
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='prefetch',
+                                        daemon=True)
+        self._thread.start()
+        semaphore = asyncio.Semaphore(limit)
+
+        async def stage(unit: tuple) -> dict:
+            async with semaphore:
+                return await asyncio.to_thread(stage_unit, unit)
+
+        self._stage = stage
+        self._staged = []
+        self._schedule(limit)
+
+    def _schedule(self, end: int) -> None:
+        import asyncio
+        for unit in self.units[len(self._staged):end]:
+            self._staged.append(asyncio.run_coroutine_threadsafe(self._stage(unit), self._loop))
+
+    def wait(self, index: int) -> dict:
+        self._schedule(index + 1 + self.limit)
+        return self._staged[index].result()
+
+    def close(self, keep_tmp: bool = False) -> None:
+        """Stop staging, and remove staged copies that no extractor used up."""
+        import asyncio
+        for future in self._staged:
+            future.cancel()
+        asyncio.run_coroutine_threadsafe(self._loop.shutdown_default_executor(),
+                                         self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        if keep_tmp:
+            return
+        for unit in self.units:
+            for path in _stage_tmp_paths(unit):
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+
+
+def start_prefetch(units: list[tuple], limit: int) -> Prefetcher | None:
+    """A Prefetcher for a serial run, or None when there is too little to stage."""
+    if limit <= 0 or len(units) <= 1:
+        return None
+    total = 0
+    for unit in units:
+        for path in stage_inputs(unit):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+    return Prefetcher(units, limit) if total >= PREFETCH_MIN_BYTES else None
+
+
+def _after_staging(prefetch: Prefetcher, index: int, unit: tuple) -> Iterator[Row]:
+    staged = prefetch.wait(index)
+    if staged['bytes_copied']:
+        _record(**staged)
+    yield from extract_unit(unit)
+
+
+def _counted(rows: Iterable[Row], counts: list[int], index: int,
+             done: Callable[[int], None] | None = None) -> Iterator[Row]:
+    for row in rows:
+        counts[index] += 1
+        yield row
+    if done is not None:
+        done(index)
+
+
+def open_runs(units: list[tuple], jobs: int, spill_dir: Path | None,
+              counts: list[int], stats: list[dict] | None = None,
+              prefetch: Prefetcher | None = None,
+              done: Callable[[int], None] | None = None) -> list[Iterator[Row]]:
+    """Return one most-recent-first run per unit, in unit order.
+
+    With `jobs` > 1 the units run across worker processes, each spilling its run
+    to `spill_dir`; the runs are then streamed back from disk. `counts[i]` ends
+    up holding the number of rows produced by `units[i]`, and `stats[i]`, when
+    given, its instrumentation counters (see `new_stats`). A serial run waits
+    for `prefetch`, when given, to stage each unit before extracting it.
+    `done(i)`, when given, is called as soon as unit i's extractor is exhausted
+    (before its run is sorted) or its spill file is written, with `counts[i]`
+    final; streamed History runs finish only as the merge drains them.
+    Runs are never pre-merged here, so `runs[i]` is always `units[i]`'s: pass
+    the final list through `bounded_runs` before merging it.
+    """
+    serial = jobs <= 1 or len(units) <= 1
+    if serial and (len(units) <= MERGE_FAN_IN or spill_dir is None):
+        runs = []
+        for i, unit in enumerate(units):
+            rows = extract_unit(unit) if prefetch is None else _after_staging(prefetch, i, unit)
+            if stats is not None:
+                rows = _timed(rows, stats[i])
+            runs.append(sorted_run(unit[0], _counted(rows, counts, i, done)))
+        return runs
+    if serial:
+        # Too many units to stream at once (each History run holds its database
+        # open until the merge drains it): spill them one after another.
+        spills = []
+        for i, unit in enumerate(units):
+            unit_stats = stats[i] if stats is not None else None
+            if prefetch is not None:
+                staged = prefetch.wait(i)
+                if unit_stats is not None and staged['bytes_copied']:
+                    for key, value in staged.items():
+                        unit_stats[key] += value
+            spills.append(spill_unit(unit, spill_dir, unit_stats))
+            counts[i] = spills[-1][1]
+            if done is not None:
+                done(i)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        spills = []
+        with ProcessPoolExecutor(max_workers=min(jobs, len(units))) as pool:
+            for i, spill in enumerate(pool.map(spill_unit, units, [spill_dir] * len(units),
+                                               stats or [None] * len(units),
+                                               chunksize=max(1, len(units) // (jobs * 4)))):
+                spills.append(spill)
+                counts[i] = spill[1]
+                if done is not None:
+                    done(i)
+    for i, (_, _, unit_stats) in enumerate(spills):
+        if stats is not None:
+            stats[i].update(unit_stats)
+    # read_spill opens its file on the first row, so no handle is held yet.
+    return [read_spill(path) for path, _, _ in spills]
+
+
+def bounded_runs(runs: list[Iterator[Row]], spill_dir: Path | None) -> list[Iterator[Row]]:
+    """Cut a list of runs down to at most MERGE_FAN_IN before they are merged.
+
+    While there are more, consecutive groups of MERGE_FAN_IN runs are merged
+    into one spill file each; merging consecutive groups keeps ties in run
+    order. Without a `spill_dir` the runs are returned as they are.
+    """
+    while spill_dir is not None and len(runs) > MERGE_FAN_IN:
+        runs = [read_spill(write_spill(merge_runs(runs[i:i + MERGE_FAN_IN]),
+                                       spill_dir, 'merged_')[0])
+                for i in range(0, len(runs), MERGE_FAN_IN)]
+    return runs
+
+
+# ---------------------------------------------------------------------------
+# Row pipeline
+# ---------------------------------------------------------------------------
+
+def merge_runs(runs: list[Iterator[Row]]) -> Iterator[Row]:
+    """K-way merge of most-recent-first runs; ties keep unit order (stable)."""
+    return heapq.merge(*runs, key=date_sort_key, reverse=True)
+
+
+def round_dates(rows: Iterable[Row]) -> Iterator[Row]:
+    """Round each row's Date to the minute (after sorting, to keep order accurate)."""
+    for row in rows:
+        yield row._replace(Date=round_micros_to_minute(row.Date))
+
+
+# Query parameters that only track where a click came from.
+TRACKING_PARAMS = frozenset((
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'oly_anon_id',
+    'oly_enc_id', 'vero_id', 'ref_src', 'si',
+))
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+DEDUP_PARTITIONS = 64
+DEDUP_CHECK_EVERY = 65_536      # rows between memory-budget checks
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for --dedupe-normalize.
+
+    Lowercases the scheme and host, drops a default port, the fragment and
+    tracking parameters (utm_*, fbclid, gclid, ...). Other parameters keep
+    their order. Unparseable URLs are returned unchanged.
+    """
+    try:
+        scheme, netloc, path, query, _ = urlsplit(url)
+    except ValueError:
+        return url
+    scheme = scheme.lower()
+    userinfo, at, host = netloc.rpartition('@')
+    host = host.lower()
+    if host.endswith(DEFAULT_PORTS.get(scheme, '\0')):
+        host = host[:-len(DEFAULT_PORTS[scheme])]
+    if query:
+        params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+                  if k not in TRACKING_PARAMS and not k.startswith('utm_')]
+        query = urlencode(params)
+    return urlunsplit((scheme, userinfo + at + host, path, query, ''))
+
+
+def _dedupe_digest(bits: int, normalize: bool):
+    """Return a function mapping a row to a fixed-width digest of its dedup key.
+
+    64-bit digests are Python's hash of the key tuple (keyed SipHash for the
+    strings; stable within one run, which is all dedup needs). 128-bit digests
+    are BLAKE2b, for exports large enough that a 64-bit collision matters.
+    """
+    url_of = (lambda row: normalize_url(row.URL)) if normalize else (lambda row: row.URL)
+    if bits == 64:
+        return lambda row: hash((row.Profile, row.Date, url_of(row)))
+    blake2b = hashlib.blake2b
+    return lambda row: blake2b(f'{row.Profile}\0{row.Date}\0{url_of(row)}'.encode(
+        'utf-8', 'surrogatepass'), digest_size=bits // 8).digest()
+
+
+def _digest_set_bytes(seen: set) -> int:
+    """Approximate memory held by a set of digests: the table plus one digest object."""
+    if not seen:
+        return sys.getsizeof(seen)
+    return sys.getsizeof(seen) + len(seen) * sys.getsizeof(next(iter(seen)))
+
+
+def dedupe_rows(rows: Iterable[Row], bits: int = 64, normalize: bool = False,
+                memory_budget: int = 0, spill_dir: Path | None = None) -> Iterator[Row]:
+    """Drop repeated (Profile, Date, URL) keys — first-seen wins = most recent wins.
+
+    Keys are kept as `bits`-wide digests, not string tuples. With
+    `normalize`, URLs are compared by `normalize_url`. Once the digest set
+    outgrows `memory_budget` bytes, the remaining rows are deduplicated
+    through hash partitions on disk (see `_dedupe_partitioned`); rows still
+    come out in their original order.
+    """
+    digest = _dedupe_digest(bits, normalize)
+    seen = set()
+    add = seen.add
+    rows = iter(rows)
+    n = 0
+    for row in rows:
+        key = digest(row)
+        if key not in seen:
+            add(key)
+            yield row
+            n += 1
+            if memory_budget and n % DEDUP_CHECK_EVERY == 0 \
+                    and _digest_set_bytes(seen) > memory_budget:
+                break
+    else:
+        return
+    console.print(f'  [dim]dedup passed its {_format_bytes(memory_budget)} budget after '
+                  f'{n} rows; spilling to disk[/dim]')
+    yield from _dedupe_partitioned(rows, digest, seen, spill_dir)
+
+
+def _dedupe_partitioned(rows: Iterator[Row], digest, seen: set,
+                        spill_dir: Path | None) -> Iterator[Row]:
+    """Deduplicate the rest of a stream in DEDUP_PARTITIONS on-disk hash partitions.
+
+    Rows whose key is already in `seen` are dropped on the way in; the others
+    are written with their sequence number to the partition chosen by their
+    digest. Each partition is then deduplicated on its own (first sequence
+    number wins) and the survivors are merged back into sequence order.
+    """
+    work = Path(tempfile.mkdtemp(prefix='tmp_dedup_', dir=spill_dir))
+    try:
+        parts = [open(work / f'in_{i}', 'wb') for i in range(DEDUP_PARTITIONS)]
+        buffers = [[] for _ in range(DEDUP_PARTITIONS)]
+        try:
+            for seq, row in enumerate(rows):
+                key = digest(row)
+                if key in seen:
+                    continue
+                i = (key if type(key) is int else int.from_bytes(key[:8])) % DEDUP_PARTITIONS
+                buffers[i].append((seq, key, tuple(row)))
+                if len(buffers[i]) >= SPILL_BATCH_ROWS:
+                    pickle.dump(buffers[i], parts[i], pickle.HIGHEST_PROTOCOL)
+                    buffers[i] = []
+            for f, buffer in zip(parts, buffers):
+                if buffer:
+                    pickle.dump(buffer, f, pickle.HIGHEST_PROTOCOL)
+        finally:
+            for f in parts:
+                f.close()
+        seen.clear()
+        del buffers
+
+        outputs = []
+        for i in range(DEDUP_PARTITIONS):
+            out_path = work / f'out_{i}'
+            kept = set()
+            with open(out_path, 'wb') as out:
+                batch = []
+                for seq, key, row in _load_batches(work / f'in_{i}'):
+                    if key not in kept:
+                        kept.add(key)
+                        batch.append((seq, row))
+                        if len(batch) >= SPILL_BATCH_ROWS:
+                            pickle.dump(batch, out, pickle.HIGHEST_PROTOCOL)
+                            batch = []
+                if batch:
+                    pickle.dump(batch, out, pickle.HIGHEST_PROTOCOL)
+            (work / f'in_{i}').unlink()
+            outputs.append(_load_batches(out_path))
+
+        intern = sys.intern
+        for _, row in heapq.merge(*outputs, key=lambda item: item[0]):
+            if len(row) != 7:
+                yield _visit_row(row)
+                continue
+            profile, source, group, date, color, title, url = row
+            yield Row(intern(profile), intern(source), _intern(group), date,
+                      _intern(color), title, url)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def _load_batches(path: Path) -> Iterator:
+    """Stream the items of a file of pickled lists."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield from pickle.load(f)
+            except EOFError:
+                return
+
+
+def write_csv(rows: Iterable[Row], path: Path) -> int:
+    """Stream rows into a CSV file; returns the number of rows written.
+
+    Rows go to a sibling `.tmp` file that replaces `path` only once complete, so
+    a failed run never truncates the previous export (which may be an input).
+    """
+    count = 0
+    fields, rows = _export_fields(rows)
+    with _replace_on_success(path) as tmp_path, \
+            open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        if fields is CSV_FIELDS:
+            for profile, source, group, date, color, title, url in rows:
+                writer.writerow((profile, source, group, format_minute(date), color, title, url))
+                count += 1
+        else:
+            for profile, source, group, date, color, title, url, *visit in rows:
+                writer.writerow((profile, source, group, format_minute(date), color, title, url,
+                                 *visit))
+                count += 1
+    return count
+
+
+# ---------------------------------------------------------------------------
+# Output formats (--format)
+# ---------------------------------------------------------------------------
+
+WRITE_BATCH_ROWS = 65_536       # rows per JSONL/SQLite batch and Parquet/Arrow row group
+SQLITE_TABLE = 'chrome_export'
+
+
+@contextmanager
+def _replace_on_success(path: Path) -> Iterator[Path]:
+    """Yield a sibling `.tmp` path that atomically replaces `path` on success."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _export_fields(rows: Iterable[Row]) -> tuple[list[str], Iterator[Row]]:
+    """The columns of an export, from its first row, and the unchanged row stream.
+
+    A stream of VisitRows (--history-visits, see `widen_rows`) adds VISIT_FIELDS.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return CSV_FIELDS, rows
+    return (CSV_FIELDS + VISIT_FIELDS if type(first) is VisitRow else CSV_FIELDS,
+            chain((first,), rows))
+
+
+def _batched(rows: Iterable[Row], size: int) -> Iterator[list[Row]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _date_or_none(us: int) -> str | None:
+    return format_minute(us) if us else None
+
+
+def write_jsonl(rows: Iterable[Row], path: Path) -> int:
+    """One JSON object per row; a missing Date (or visit count) is null instead of ''."""
+    count = 0
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    fields, rows = _export_fields(rows)
+    with _replace_on_success(path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+        for batch in _batched(rows, WRITE_BATCH_ROWS):
+            if fields is CSV_FIELDS:
+                f.write(''.join(
+                    dumps({'Profile': p, 'Source': s, 'Group': g, 'Date': _date_or_none(d),
+                           'Color': c, 'Title': t, 'URL': u}) + '\n'
+                    for p, s, g, d, c, t, u in batch))
+            else:
+                f.write(''.join(
+                    dumps({'Profile': p, 'Source': s, 'Group': g, 'Date': _date_or_none(d),
+                           'Color': c, 'Title': t, 'URL': u, 'Transition': tr,
+                           'VisitCount': vc, 'TypedCount': tc, 'VisitDuration': vd}) + '\n'
+                    for p, s, g, d, c, t, u, tr, vc, tc, vd in batch))
+            count += len(batch)
+    return count
+
+
+# Column definitions of VISIT_FIELDS in the sqlite format and the store;
+# VisitDuration is in microseconds, like Chrome's visit_duration.
+SQLITE_VISIT_COLUMNS = ('Transition TEXT', 'VisitCount INTEGER', 'TypedCount INTEGER',
+                        'VisitDuration INTEGER')
+
+
+def _sqlite_create_export(conn: sqlite3.Connection, visits: bool = False) -> None:
+    extra = ''.join(f', {column}' for column in SQLITE_VISIT_COLUMNS) if visits else ''
+    conn.execute(f'''CREATE TABLE IF NOT EXISTS {SQLITE_TABLE} (
+        Profile TEXT NOT NULL, Source TEXT NOT NULL, "Group" TEXT NOT NULL,
+        Date TEXT, Color TEXT NOT NULL, Title TEXT, URL TEXT NOT NULL{extra})''')
+
+
+def _sqlite_params(batch: list[Row]) -> Iterator[tuple]:
+    if batch and type(batch[0]) is VisitRow:
+        for p, s, g, d, c, t, u, *visit in batch:
+            yield p, s, g, _date_or_none(d), c, t, u, *visit
+        return
+    for p, s, g, d, c, t, u in batch:
+        yield p, s, g, _date_or_none(d), c, t, u
+
+
+def write_sqlite(rows: Iterable[Row], path: Path) -> int:
+    """A fresh SQLite database with one `chrome_export` table, in export order.
+
+    Dates are 'YYYY-MM-DD HH:MM' text (NULL when missing), which SQLite's date
+    functions understand. The file is built without a journal and swapped in
+    once complete.
+    """
+    count = 0
+    fields, rows = _export_fields(rows)
+    with _replace_on_success(path) as tmp_path:
+        tmp_path.unlink(missing_ok=True)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute('PRAGMA journal_mode=OFF')
+            conn.execute('PRAGMA synchronous=OFF')
+            _sqlite_create_export(conn, visits=fields is not CSV_FIELDS)
+            insert = f'INSERT INTO {SQLITE_TABLE} VALUES ({", ".join("?" * len(fields))})'
+            for batch in _batched(rows, WRITE_BATCH_ROWS):
+                conn.executemany(insert, _sqlite_params(batch))
+                count += len(batch)
+            conn.commit()
+        finally:
+            conn.close()
+    return count
+
+
+def _import_pyarrow():
+    """Import pyarrow, the optional dependency behind --format parquet/arrow."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit('--format parquet/arrow needs pyarrow: install the "arrow" extra '
+                         '(uv sync --extra arrow) or run with `uv run --with pyarrow`.') from None
+    return pyarrow
+
+
+class _Categories(dict):
+    """Value -> dictionary index, growing as new values appear."""
+    def __missing__(self, key):
+        self[key] = index = len(self)
+        return index
+
+
+def _arrow_schema(pa, visits: bool = False):
+    category = pa.dictionary(pa.int32(), pa.string())
+    fields = [('Profile', category), ('Source', category), ('Group', category),
+              ('Date', pa.timestamp('us')), ('Color', category),
+              ('Title', pa.string()), ('URL', pa.string())]
+    if visits:
+        fields += [('Transition', category), ('VisitCount', pa.int64()),
+                   ('TypedCount', pa.int64()), ('VisitDuration', pa.duration('us'))]
+    return pa.schema(fields)
+
+
+def _arrow_batches(rows: Iterable[Row], schema, pa) -> Iterator:
+    """Convert the row stream into Arrow record batches of WRITE_BATCH_ROWS rows.
+
+    Profile, Source, Group, Color (and Transition) are dictionary-encoded
+    against one dictionary per column that only grows, so every batch's
+    dictionary extends the previous one (an IPC dictionary delta). Date is a
+    timezone-less microsecond timestamp holding the same wall-clock value as
+    the CSV. A schema with VISIT_FIELDS takes them from VisitRows.
+    """
+    profiles, sources, groups, colors, transitions = (_Categories() for _ in range(5))
+    visits = len(schema) > len(CSV_FIELDS)
+
+    def encode(values, categories):
+        indices = pa.array([categories[v] for v in values], pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, pa.array(list(categories), pa.string()))
+
+    for batch in _batched(rows, WRITE_BATCH_ROWS):
+        profile, source, group, date, color, title, url, *visit = zip(*batch)
+        columns = [
+            encode(profile, profiles), encode(source, sources), encode(group, groups),
+            pa.array([d or None for d in date], pa.timestamp('us')), encode(color, colors),
+            pa.array(title, pa.string()), pa.array(url, pa.string()),
+        ]
+        if visits:
+            transition, visit_count, typed_count, duration = visit
+            columns += [encode(transition, transitions), pa.array(visit_count, pa.int64()),
+                        pa.array(typed_count, pa.int64()), pa.array(duration, pa.duration('us'))]
+        yield pa.record_batch(columns, schema=schema)
+
+
+def write_parquet(rows: Iterable[Row], path: Path) -> int:
+    """Parquet with zstd compression, one row group per WRITE_BATCH_ROWS rows."""
+    pa = _import_pyarrow()
+    fields, rows = _export_fields(rows)
+    schema = _arrow_schema(pa, visits=fields is not CSV_FIELDS)
+    count = 0
+    with _replace_on_success(path) as tmp_path:
+        with pa.parquet.ParquetWriter(tmp_path, schema, compression='zstd') as writer:
+            for batch in _arrow_batches(rows, schema, pa):
+                writer.write_batch(batch)
+                count += batch.num_rows
+    return count
+
+
+def write_arrow(rows: Iterable[Row], path: Path) -> int:
+    """Arrow IPC file (Feather v2), written batch by batch."""
+    pa = _import_pyarrow()
+    fields, rows = _export_fields(rows)
+    schema = _arrow_schema(pa, visits=fields is not CSV_FIELDS)
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    count = 0
+    with _replace_on_success(path) as tmp_path:
+        with pa.OSFile(str(tmp_path), 'wb') as sink, \
+                pa.ipc.new_file(sink, schema, options=options) as writer:
+            for batch in _arrow_batches(rows, schema, pa):
+                writer.write_batch(batch)
+                count += batch.num_rows
+    return count
+
+
+# Format -> (writer, file suffix). Writers consume the row stream and return
+# the number of rows written; see the readers below for reading exports back.
+OUTPUT_FORMATS = {
+    'csv': (write_csv, '.csv'),
+    'jsonl': (write_jsonl, '.jsonl'),
+    'parquet': (write_parquet, '.parquet'),
+    'arrow': (write_arrow, '.arrow'),
+    'sqlite': (write_sqlite, '.sqlite'),
+}
+
+
+def _int_or_none(text: str) -> int | None:
+    return int(text) if text else None
+
+
+def _read_csv_export(path: Path) -> Iterator[tuple]:
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header == CSV_FIELDS:
+            for profile, source, group, date, color, title, url in reader:
+                yield profile, source, group, parse_minute(date), color, title, url
+        elif header == CSV_FIELDS + VISIT_FIELDS:
+            for profile, source, group, date, color, title, url, transition, *counts in reader:
+                yield (profile, source, group, parse_minute(date), color, title, url,
+                       transition, *map(_int_or_none, counts))
+        else:
+            raise ValueError('unexpected columns')
+
+
+def _read_jsonl_export(path: Path) -> Iterator[tuple]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            r = json.loads(line)
+            row = (r['Profile'], r['Source'], r['Group'], parse_minute(r['Date']),
+                   r['Color'], r['Title'], r['URL'])
+            yield row + tuple(r[name] for name in VISIT_FIELDS) if 'Transition' in r else row
+
+
+def _read_sqlite_export(path: Path) -> Iterator[tuple]:
+    conn = sqlite3.connect(_sqlite_uri(path, mode='ro'), uri=True)
+    try:
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({SQLITE_TABLE})')}
+        extra = ''.join(f', {name}' for name in VISIT_FIELDS) if 'Transition' in columns else ''
+        for p, s, g, d, c, t, u, *visit in conn.execute(
+                f'SELECT Profile, Source, "Group", Date, Color, Title, URL{extra} '
+                f'FROM {SQLITE_TABLE} ORDER BY rowid'):
+            yield p, s, g, parse_minute(d), c, t, u, *visit
+    finally:
+        conn.close()
+
+
+def _read_arrow_export(path: Path) -> Iterator[tuple]:
+    pa = _import_pyarrow()
+    if path.suffix == '.parquet':
+        batches = pa.parquet.ParquetFile(path).iter_batches(batch_size=WRITE_BATCH_ROWS)
+    else:
+        reader = pa.ipc.open_file(pa.memory_map(str(path)))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        names = CSV_FIELDS + VISIT_FIELDS if 'Transition' in batch.schema.names else CSV_FIELDS
+        columns = [batch.column(name) for name in names]
+        columns[3] = columns[3].cast(pa.int64()).fill_null(NO_DATE)
+        if len(columns) > len(CSV_FIELDS):
+            columns[-1] = columns[-1].cast(pa.int64())
+        yield from zip(*(column.to_pylist() for column in columns))
+
+
+EXPORT_READERS = {
+    '.csv': _read_csv_export,
+    '.jsonl': _read_jsonl_export,
+    '.parquet': _read_arrow_export,
+    '.arrow': _read_arrow_export,
+    '.sqlite': _read_sqlite_export,
+}
+
+
+# ---------------------------------------------------------------------------
+# Persistent export store (--store)
+# ---------------------------------------------------------------------------
+
+# Same columns as the sqlite format, but Date is '' rather than NULL when
+# missing so that dateless rows take part in the unique key.
+STORE_SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS {SQLITE_TABLE} (
+        Profile TEXT NOT NULL, Source TEXT NOT NULL, "Group" TEXT NOT NULL,
+        Date TEXT NOT NULL, Color TEXT NOT NULL, Title TEXT, URL TEXT NOT NULL);
+    CREATE UNIQUE INDEX IF NOT EXISTS {SQLITE_TABLE}_key ON {SQLITE_TABLE} (Profile, Date, URL);
+    CREATE INDEX IF NOT EXISTS {SQLITE_TABLE}_url ON {SQLITE_TABLE} (URL);
+    CREATE INDEX IF NOT EXISTS {SQLITE_TABLE}_date ON {SQLITE_TABLE} (Date);
+'''
+
+# Existing keys are only rewritten when a value actually changed, so a repeat
+# run over unchanged data costs one index lookup per row and no page writes.
+STORE_UPSERT = f'''
+    INSERT INTO {SQLITE_TABLE} (Profile, Source, "Group", Date, Color, Title, URL)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (Profile, Date, URL) DO UPDATE SET
+        Source = excluded.Source, "Group" = excluded."Group",
+        Color = excluded.Color, Title = excluded.Title
+    WHERE Source IS NOT excluded.Source OR "Group" IS NOT excluded."Group"
+       OR Color IS NOT excluded.Color OR Title IS NOT excluded.Title
+'''
+
+
+# STORE_UPSERT for VisitRows; the store gains SQLITE_VISIT_COLUMNS the first
+# time it gets them (see `_store_visit_columns`).
+STORE_UPSERT_VISITS = f'''
+    INSERT INTO {SQLITE_TABLE} (Profile, Source, "Group", Date, Color, Title, URL,
+                                Transition, VisitCount, TypedCount, VisitDuration)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (Profile, Date, URL) DO UPDATE SET
+        Source = excluded.Source, "Group" = excluded."Group",
+        Color = excluded.Color, Title = excluded.Title, Transition = excluded.Transition,
+        VisitCount = excluded.VisitCount, TypedCount = excluded.TypedCount,
+        VisitDuration = excluded.VisitDuration
+    WHERE Source IS NOT excluded.Source OR "Group" IS NOT excluded."Group"
+       OR Color IS NOT excluded.Color OR Title IS NOT excluded.Title
+       OR Transition IS NOT excluded.Transition OR VisitCount IS NOT excluded.VisitCount
+       OR TypedCount IS NOT excluded.TypedCount OR VisitDuration IS NOT excluded.VisitDuration
+'''
+
+
+def _store_visit_columns(conn: sqlite3.Connection) -> None:
+    """Add SQLITE_VISIT_COLUMNS to a store created without them."""
+    have = {row[1] for row in conn.execute(f'PRAGMA table_info({SQLITE_TABLE})')}
+    for column in SQLITE_VISIT_COLUMNS:
+        if column.split()[0] not in have:
+            conn.execute(f'ALTER TABLE {SQLITE_TABLE} ADD COLUMN {column}')
+
+
+def open_store(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) the export store in WAL mode."""
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(STORE_SCHEMA)
+    return conn
+
+
+def upsert_store(rows: Iterable[Row], path: Path) -> dict[str, int]:
+    """Upsert the row stream into the store at `path` in one transaction.
+
+    Rows are keyed on (Profile, Date, URL); the caller deduplicates the stream
+    so the first (most recent) row of a run wins. Returns counts of rows seen,
+    inserted and updated. A failed run rolls back and leaves the store as it was.
+    """
+    conn = open_store(path)
+    fields, rows = _export_fields(rows)
+    try:
+        high = conn.execute(f'SELECT MAX(rowid) FROM {SQLITE_TABLE}').fetchone()[0] or 0
+        changes = conn.total_changes
+        count = 0
+        with conn:
+            if fields is not CSV_FIELDS:
+                _store_visit_columns(conn)
+            for batch in _batched(rows, WRITE_BATCH_ROWS):
+                if fields is CSV_FIELDS:
+                    conn.executemany(STORE_UPSERT, (
+                        (p, s, g, format_minute(d), c, t, u) for p, s, g, d, c, t, u in batch))
+                else:
+                    conn.executemany(STORE_UPSERT_VISITS, (
+                        (p, s, g, format_minute(d), c, t, u, *visit)
+                        for p, s, g, d, c, t, u, *visit in batch))
+                count += len(batch)
+        inserted = conn.execute(f'SELECT COUNT(*) FROM {SQLITE_TABLE} WHERE rowid > ?',
+                                (high,)).fetchone()[0]
+        return {'rows': count, 'inserted': inserted,
+                'updated': conn.total_changes - changes - inserted}
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Incremental history
+# ---------------------------------------------------------------------------
+
+STATE_VERSION = 1
+
+
+def load_state(path: Path) -> dict:
+    """Load the incremental state file, or return an empty state.
+
+    Layout: {'version', 'export': <path of the last export>, 'profiles':
+    {<profile dir>: {'name', 'last_visit_time', 'visits', 'export'}}} with
+    Chrome timestamps; `visits` records whether the export was per visit and
+    `export` the export holding the profile's History (the top-level one when
+    missing). A profile only resumes when its export is the one being merged.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+        console.print(f'[yellow]Ignoring state file with unknown version:[/yellow] {path}')
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        console.print(f'[yellow]Ignoring unreadable state file {path}: {e}[/yellow]')
+    return {'version': STATE_VERSION, 'export': '', 'profiles': {}}
+
+
+def state_key(profile_dir: Path) -> str:
+    """State file key of a profile: its resolved directory, so a relative
+    --chrome-dir resumes from any working directory."""
+    return str(profile_dir.resolve())
+
+
+def save_state(path: Path, state: dict) -> None:
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def parse_minute(date_str: str) -> int:
+    """Inverse of `format_minute`: 'YYYY-MM-DD HH:MM' -> pipeline microseconds."""
+    if not date_str:
+        return NO_DATE
+    try:
+        return (datetime.fromisoformat(date_str) - UNIX_EPOCH) // timedelta(microseconds=1)
+    except ValueError:
+        return NO_DATE
+
+
+def read_export(path: Path, keep) -> Iterator[Row]:
+    """Stream rows of a previous export for which `keep(row)` is true.
+
+    The reader is picked by file suffix (see EXPORT_READERS). The export is
+    already most-recent-first, so the result is a valid merge run.
+    """
+    reader = EXPORT_READERS.get(path.suffix.lower(), _read_csv_export)
+    intern = sys.intern
+    try:
+        for values in reader(path):
+            if len(values) == 7:
+                profile, source, group, date, color, title, url = values
+                row = Row(intern(profile), intern(source), intern(group), date,
+                          intern(color), title, url)
+            else:
+                row = _visit_row(values)
+            if keep(row):
+                yield row
+    except (KeyError, ValueError, TypeError, sqlite3.Error) as e:
+        console.print(f'[yellow]Previous export is unreadable ({e}), ignoring the rest of '
+                      f'it:[/yellow] {path}')
+
+
+def _capture(rows: Iterable[Row], preview: list[Row], limit: int) -> Iterator[Row]:
+    for row in rows:
+        if len(preview) < limit:
+            preview.append(row)
+        yield row
+
+
+# ---------------------------------------------------------------------------
+# Library API
+# ---------------------------------------------------------------------------
+
+def _as_micros(when) -> int | None:
+    """A --since/--until style bound: pipeline micros, a `datetime`, or `parse_when` text."""
+    if when is None or isinstance(when, int):
+        return when
+    if isinstance(when, datetime):
+        when = when.isoformat(' ')
+    try:
+        return parse_when(when)
+    except argparse.ArgumentTypeError as e:
+        raise ValueError(str(e)) from None
+
+
+def file_sink(path, format: str | None = None):
+    """Sink writing rows to an export file; the format defaults to the path's suffix."""
+    path = Path(path).expanduser()
+    if format is None:
+        format = next((name for name, (_, suffix) in OUTPUT_FORMATS.items()
+                       if suffix == path.suffix.lower()), 'csv')
+    return partial(OUTPUT_FORMATS[format][0], path=path)
+
+
+def store_sink(path):
+    """Sink upserting rows into a `--store` database; returns its counts."""
+    return partial(upsert_store, path=Path(path).expanduser())
+
+
+class Extractor:
+    """Reusable extraction session for programs that export repeatedly.
+
+    Profiles are found once (`profiles(refresh=True)` looks again), and the
+    History connections, OneTab LevelDB snapshots and Bookmarks files opened
+    by one `rows()` call are kept for the next (see `ResourcePool`), so repeat
+    calls with other filters skip the copy and open. Units run serially in
+    this process. Nothing is printed: warnings go to `log(text)` when given,
+    and `progress(done, total, profile_name, source, rows)` is called as each
+    profile x source unit finishes.
+
+        with Extractor(sources=('history',)) as session:
+            recent = list(session.rows(since='7d'))
+            session.export(file_sink('github.jsonl'), domains=['github.com'])
+    """
+
+    def __init__(self, chrome_dir=None, *, roots: Iterable[str] | None = None,
+                 profiles: Iterable[str] | None = None, sources: Iterable[str] = SOURCES,
+                 history_access: str = 'auto', history_visits: bool = False,
+                 deduplicate: bool = True, dedupe_normalize: bool = False,
+                 cache_dir=None, cache_size: int = 256, tmp_dir=None,
+                 progress=None, log=None):
+        self.chrome_dir = Path(chrome_dir).expanduser() if chrome_dir else get_chrome_dir()
+        self.roots = list(roots or ())
+        self.profile_patterns = list(profiles or ())
+        self.sources = self._check_sources(sources)
+        self.history_access = history_access
+        self.history_visits = history_visits
+        self.deduplicate = deduplicate
+        self.dedupe_normalize = dedupe_normalize
+        self.cache = ExtractionCache(Path(cache_dir).expanduser(), cache_size * 1024 * 1024) \
+            if cache_dir else None
+        self.progress = progress
+        self.log = log
+        self._tmp_dir = Path(tmp_dir).expanduser() if tmp_dir else None
+        self._own_tmp = None
+        self._profiles = None
+        self.resources = ResourcePool()
+
+    @staticmethod
+    def _check_sources(sources: Iterable[str]) -> list[str]:
+        sources = [sources] if isinstance(sources, str) else list(sources)
+        unknown = set(sources) - set(SOURCES)
+        if unknown:
+            raise ValueError(f'Unknown source(s): {", ".join(sorted(unknown))}')
+        return [source for source in SOURCES if source in sources]
+
+    def _context(self) -> contextvars.Context:
+        """A copy of the current context whose `log_handler` is this session's `log`.
+
+        Session work runs inside it (`Context.run`), so the handler is never
+        swapped globally: other sessions, threads and the caller's own code
+        between two rows keep theirs.
+        """
+        context = contextvars.copy_context()
+        context.run(log_handler.set, self.log or (lambda text: None))
+        return context
+
+    def _tmp_base(self) -> Path:
+        if self._tmp_dir is not None:
+            return self._tmp_dir
+        if self._own_tmp is None:
+            self._own_tmp = Path(tempfile.mkdtemp(prefix='onetab_extractor_'))
+        return self._own_tmp
+
+    def profiles(self, refresh: bool = False) -> list[tuple[Path, str]]:
+        """(profile_dir, profile_name) of every selected profile, found once."""
+        if self._profiles is None or refresh:
+            context = self._context()
+            profiles = context.run(discover_profiles, self.roots) if self.roots \
+                else context.run(find_profiles, self.chrome_dir)
+            self._profiles = select_profiles(profiles, self.profile_patterns)
+        return self._profiles
+
+    def rows(self, *, since=None, until=None, domains: Iterable[str] = (),
+             sources: Iterable[str] | None = None,
+             profiles: Iterable[str] | None = None) -> Iterator[Row]:
+        """Stream the export's rows, most recent first, as the CLI would write them.
+
+        `since`/`until` take pipeline microseconds, a `datetime` or `--since`
+        text ('2026-01-01', '30d'); `profiles` narrows the session's
+        profiles by glob; `sources` narrows its sources.
+        """
+        row_filter = RowFilter(_as_micros(since), _as_micros(until), domains) \
+            if since is not None or until is not None or domains else None
+        bounds = row_filter.on_clock('utc') if row_filter is not None else None
+        if bounds is not None and bounds.since is not None \
+                and bounds.until is not None and bounds.since >= bounds.until:
+            raise ValueError('since must be earlier than until')
+        sources = self.sources if sources is None else self._check_sources(sources)
+        selected = select_profiles(self.profiles(), list(profiles or ()))
+        options = {'history': {'access': self.history_access}}
+        if self.history_visits:
+            options['history']['visits'] = True
+        for source in sources:
+            option = options.setdefault(source, {})
+            option['resources'] = self.resources
+            if self.cache is not None:
+                option['cache'] = self.cache
+            if row_filter is not None:
+                option['row_filter'] = row_filter
+        units = build_units(selected, sources, self._tmp_base(), False, options)
+        return self._stream(units)
+
+    def _stream(self, units: list[tuple]) -> Iterator[Row]:
+        """Step `_pipeline` inside the session's context, one row at a time."""
+        context = self._context()
+        rows = self._pipeline(units)
+        try:
+            while True:
+                try:
+                    row = context.run(next, rows)
+                except StopIteration:
+                    return
+                yield row
+        finally:
+            context.run(rows.close)
+
+    def _pipeline(self, units: list[tuple]) -> Iterator[Row]:
+        counts = [0] * len(units)
+        finished = [0]
+
+        def reported(i: int) -> None:
+            finished[0] += 1
+            self.progress(finished[0], len(units), units[i][2], units[i][0], counts[i])
+
+        try:
+            runs = open_runs(units, 1, None, counts,
+                             done=reported if self.progress is not None else None)
+            rows = round_dates(merge_runs(runs))
+            if self.history_visits:
+                rows = widen_rows(rows)
+            if self.deduplicate:
+                rows = dedupe_rows(rows, normalize=self.dedupe_normalize,
+                                   memory_budget=512 * 1024 * 1024,
+                                   spill_dir=self._tmp_base())
+            yield from rows
+        finally:
+            if self.cache is not None:
+                self.cache.evict()
+
+    def export(self, sink=list, **filters):
+        """Feed `rows(**filters)` to `sink` (e.g. `file_sink`, `store_sink`, `list`)
+        and return what it returns."""
+        return sink(self.rows(**filters))
+
+    def close(self) -> None:
+        """Close the pooled handles and remove the session's temp copies."""
+        self.resources.close()
+        if self._own_tmp is not None:
+            shutil.rmtree(self._own_tmp, ignore_errors=True)
+            self._own_tmp = None
+
+    def __enter__(self) -> 'Extractor':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 # ---------------------------------------------------------------------------
@@ -477,104 +3325,390 @@ def main():
 
     parser.add_argument('--chrome-dir', type=str, default=str(chrome_dir),
                         help='Chrome user data directory')
+    parser.add_argument('--root', action='append', metavar='PATTERN',
+                        help='Scan every Chrome/Chromium/Brave/Edge user-data dir at or under '
+                             'this path or glob (e.g. "/home/*", "/snapshots/**/home/*"); '
+                             'repeatable, replaces --chrome-dir')
     parser.add_argument('--all-profiles', action=argparse.BooleanOptionalAction, default=True,
                         help='Scan all profiles (default: on)')
 
     parser.add_argument('--bookmarks', action=argparse.BooleanOptionalAction, default=True)
     parser.add_argument('--history', action=argparse.BooleanOptionalAction, default=True)
     parser.add_argument('--onetab', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--source', action='append', choices=SOURCES,
+                        help='Only export this source (repeatable; default: all enabled ones)')
+    parser.add_argument('--profile', action='append', metavar='PATTERN',
+                        help='Only export profiles whose name or directory matches this '
+                             'glob, case-insensitively (repeatable), e.g. "Default", "*Work*"')
+    parser.add_argument('--since', type=parse_when, metavar='WHEN',
+                        help='Only rows dated at or after WHEN: YYYY-MM-DD[ HH:MM[:SS]] or an '
+                             'age like 30d, 12h, 2w')
+    parser.add_argument('--until', type=parse_when, metavar='WHEN',
+                        help='Only rows dated before WHEN (same forms as --since)')
+    parser.add_argument('--domain', action='append', metavar='DOMAIN',
+                        help='Only rows whose URL host is DOMAIN or a subdomain of it '
+                             '(repeatable)')
     parser.add_argument('--deduplicate', action=argparse.BooleanOptionalAction, default=True,
                         help='Deduplicate rows by (Profile, Date, URL) keeping most recent '
                              '(default: on). Use --no-deduplicate to keep all rows.')
+    parser.add_argument('--dedupe-normalize', action='store_true',
+                        help='Compare URLs after lowercasing the host and dropping fragments '
+                             'and tracking parameters (utm_*, fbclid, ...)')
+    parser.add_argument('--dedupe-bits', type=int, choices=(64, 128), default=64,
+                        help='Width of the dedup key digests (default: 64)')
+    parser.add_argument('--dedupe-memory', type=int, default=512, metavar='MB',
+                        help='Memory budget for dedup keys before spilling to disk '
+                             '(default: 512; 0 = unlimited)')
 
     parser.add_argument('-o', '--output', type=str)
+    parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='csv',
+                        help='Output format (default: csv). parquet and arrow need pyarrow.')
+    parser.add_argument('--store', type=str,
+                        help='Upsert rows into this long-lived SQLite store instead of '
+                             'writing an export file')
     parser.add_argument('-d', '--dir', type=str,
                         default=os.getenv('OUTPUT_DIR') or None)
     parser.add_argument('-dr', '--dryrun', action='store_true')
     parser.add_argument('-p', '--print', action='store_true')
     parser.add_argument('--keep-tmp', action='store_true')
+    parser.add_argument('-q', '--quiet', action='count', default=0,
+                        help='Only print warnings and errors (for cron jobs); '
+                             'twice (-qq) to print nothing')
+    parser.add_argument('--plain', action='store_true',
+                        help='Plain-text log lines even on a terminal, without loading rich')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=False,
+                        help='Keep a copy of the extracted rows in a per-user cache and reuse '
+                             'it for sources that have not changed since the last run '
+                             '(default: off)')
+    parser.add_argument('--cache-dir', type=str,
+                        help=f'Extraction cache directory (default: {get_user_cache_dir()})')
+    parser.add_argument('--cache-size', type=int, default=256, metavar='MB',
+                        help='Evict least-recently-used cache entries beyond this size '
+                             '(default: 256)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Extract profile/source units across N worker processes '
+                             '(default: 1; 0 = one per CPU)')
+    parser.add_argument('--prefetch', type=int, default=2, metavar='N',
+                        help='Without --jobs, stage up to N upcoming units\' files (copies, '
+                             'page cache) while the current one decodes; 0 = off (default: 2)')
+    parser.add_argument('--history-access', choices=HISTORY_ACCESS_MODES, default='auto',
+                        help='How to open History: read the live file immutably, back it up '
+                             'into memory, or copy it (default: auto)')
+    parser.add_argument('--history-visits', action='store_true',
+                        help='One History row per visit (dated by the visit, grouped by how '
+                             'it was reached) instead of one per URL')
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=False,
+                        help='Only read History visited since the last run and merge it into '
+                             'the previous export (default: off)')
+    parser.add_argument('--state-file', type=str,
+                        help='Incremental checkpoint file (default: '
+                             '.onetab_extractor_state.json in the output directory)')
+    parser.add_argument('--timings', action='store_true',
+                        help='Print a per-profile, per-source timing breakdown')
+    parser.add_argument('--metrics-out', type=str,
+                        help='Write durations, bytes copied, keys scanned, records decoded '
+                             'and rows per extraction unit to this JSON file')
+    parser.add_argument('--profile-out', type=str,
+                        help='Write a cProfile dump (pstats format) of the run to this file; '
+                             'with --jobs, only the main process is profiled')
+
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running: re-extract a profile/source when its files change '
+                             'and update the output')
+    parser.add_argument('--watch-interval', type=float, default=5.0, metavar='SECONDS',
+                        help='Polling interval where inotify is unavailable (default: 5)')
+    parser.add_argument('--watch-debounce', type=float, default=2.0, metavar='SECONDS',
+                        help='Wait until changed files are quiet for this long before '
+                             're-extracting (default: 2)')
 
     args = parser.parse_args()
+    if args.watch and args.dryrun:
+        parser.error('--watch cannot be combined with --dryrun')
+    if args.since is not None and args.until is not None \
+            and wall_clock(args.since, 'utc') >= wall_clock(args.until, 'utc'):
+        parser.error('--since must be earlier than --until')
+    if args.incremental and (args.since is not None or args.until is not None or args.domain):
+        parser.error('--incremental cannot be combined with --since, --until or --domain')
+    if args.source:
+        for source in SOURCES:
+            setattr(args, source, getattr(args, source) and source in args.source)
+    console.alerts_only = args.quiet >= 1
+    console.quiet = args.quiet >= 2
+    if args.plain:
+        console.plain = True
+    run = watch_export if args.watch else run_export
+
+    if args.profile_out:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run, args)
+        finally:
+            profiler.dump_stats(args.profile_out)
+            console.print(f'Profile written to [underline]{args.profile_out}[/underline] '
+                          f'(inspect with: python -m pstats {args.profile_out})')
+    else:
+        run(args)
 
-    project_dir = Path(args.dir).resolve() if args.dir else Path.cwd()
-    resolved_chrome_dir = Path(args.chrome_dir).expanduser()
 
-    if args.all_profiles:
+def prepare_output(args: argparse.Namespace) -> Path | None:
+    """Resolve `--store` and check the output options before anything is extracted."""
+    store_path = Path(args.store).expanduser().resolve() if args.store else None
+    if store_path and not args.deduplicate:
+        console.print('[yellow]--store keeps one row per (Profile, Date, URL); '
+                      'ignoring --no-deduplicate.[/yellow]')
+        args.deduplicate = True
+    if args.format in ('parquet', 'arrow') and not args.dryrun and not store_path:
+        _import_pyarrow()   # fail before extracting anything
+    return store_path
+
+
+def cache_dir(args: argparse.Namespace) -> Path:
+    return Path(args.cache_dir).expanduser() if args.cache_dir else get_user_cache_dir()
+
+
+def resolve_profiles(args: argparse.Namespace, project_dir: Path) -> list[tuple[Path, str]]:
+    """Profiles selected by the arguments; reports when none are found."""
+    if args.root:
+        names = ProfileCache(cache_dir(args) / 'profiles.json' if args.cache else None)
+        profiles = discover_profiles(args.root, names)
+        if not args.all_profiles:
+            profiles = [p for p in profiles if p[0].name == 'Default']
+        if not profiles:
+            console.print(f'[bold yellow]No browser profiles found under:[/bold yellow] '
+                          f'{", ".join(args.root)}')
+            return profiles
+    else:
+        resolved_chrome_dir = Path(args.chrome_dir).expanduser()
+        if not args.all_profiles:
+            default_dir = resolved_chrome_dir / 'Default'
+            return select_profiles([(default_dir, get_profile_identifier(default_dir))],
+                                   args.profile)
         profiles = find_profiles(resolved_chrome_dir)
         if not profiles:
-            console.print(f'[bold yellow]No Chrome profiles found under:[/bold yellow] {resolved_chrome_dir}')
-            return
-        console.print(f'Found [bold]{len(profiles)}[/bold] profile(s).')
+            console.print(f'[bold yellow]No Chrome profiles found under:[/bold yellow] '
+                          f'{resolved_chrome_dir}')
+            return profiles
+    found = len(profiles)
+    profiles = select_profiles(profiles, args.profile)
+    if not args.profile:
+        console.print(f'Found [bold]{found}[/bold] profile(s).')
+    elif not profiles:
+        console.print(f'[bold yellow]None of the {found} profile(s) found match --profile:'
+                      f'[/bold yellow] {", ".join(args.profile)}')
     else:
-        default_dir = resolved_chrome_dir / 'Default'
-        profiles = [(default_dir, get_profile_identifier(default_dir))]
-
-    all_rows = []
-
-    for profile_dir, profile_name in profiles:
-        if args.bookmarks:
-            rows = extract_bookmarks(profile_dir, profile_name)
-            if rows:
-                console.print(f'  [dim]{profile_name}[/dim] bookmarks: [cyan]{len(rows)}[/cyan]')
-            all_rows.extend(rows)
-
-        if args.history:
-            rows = extract_history(profile_dir, profile_name, project_dir, args.keep_tmp)
-            if rows:
-                console.print(f'  [dim]{profile_name}[/dim] history:   [cyan]{len(rows)}[/cyan]')
-            all_rows.extend(rows)
-
-        if args.onetab:
-            rows = extract_onetab(profile_dir, profile_name, project_dir, args.keep_tmp)
-            if rows:
-                console.print(f'  [dim]{profile_name}[/dim] onetab:    [cyan]{len(rows)}[/cyan]')
-            all_rows.extend(rows)
-
-    # Sort most-recent-first; rows with no date sort to the end
-    all_rows.sort(key=lambda r: r['Date'] or '0', reverse=True)
-
-    # Round all dates to the nearest minute (after sort to preserve order accuracy)
-    for row in all_rows:
-        row['Date'] = round_to_minute(row['Date'])
-
-    # Deduplicate by (Profile, Date, URL) — first-seen wins = most recent wins
+        console.print(f'Found [bold]{found}[/bold] profile(s), [bold]{len(profiles)}[/bold] '
+                      f'selected by --profile.')
+    return profiles
+
+
+def plan_units(args: argparse.Namespace, profiles: list[tuple[Path, str]],
+               project_dir: Path) -> tuple[list[tuple], ExtractionCache | None]:
+    """Build the extraction units for the selected sources, wired to the cache."""
+    sources = [source for source in SOURCES if getattr(args, source)]
+    options = {'history': {'access': args.history_access}}
+    if args.history_visits:
+        options['history']['visits'] = True
+    cache = None
+    if args.cache:
+        cache = ExtractionCache(cache_dir(args), args.cache_size * 1024 * 1024)
+        for source in sources:
+            options.setdefault(source, {})['cache'] = cache
+    row_filter = row_filter_from_args(args)
+    if row_filter is not None:
+        for source in sources:
+            options.setdefault(source, {})['row_filter'] = row_filter
+    return build_units(profiles, sources, project_dir, args.keep_tmp, options), cache
+
+
+def output_path(args: argparse.Namespace, project_dir: Path) -> Path:
+    """Where the export file goes: `-o`, or today's dated default name."""
+    suffix = OUTPUT_FORMATS[args.format][1]
+    date_str = datetime.now().strftime('%Y_%m_%d')
+    return project_dir / (args.output if args.output else f'{date_str}_ChromeExport{suffix}')
+
+
+def run_export(args: argparse.Namespace) -> None:
+    """Run one export for parsed command-line arguments."""
+    project_dir = Path(args.dir).resolve() if args.dir else Path.cwd()
+    write_rows = OUTPUT_FORMATS[args.format][0]
+    store_path = prepare_output(args)
+    profiles = resolve_profiles(args, project_dir)
+    if not profiles:
+        return
+    units, cache = plan_units(args, profiles, project_dir)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # Incremental mode: History units resume from each profile's checkpoint and
+    # the previous export supplies the older History rows. A store already
+    # holds them, so it only needs the new rows.
+    incremental = args.incremental and args.history
+    state_path = Path(args.state_file).expanduser() if args.state_file \
+        else project_dir / '.onetab_extractor_state.json'
+    state = load_state(state_path) if incremental else {}
+    previous_export = Path(state['export']) if incremental and state['export'] else None
+    if store_path and previous_export != store_path:
+        previous_export = None
+    if previous_export and not previous_export.exists():
+        console.print(f'[yellow]Previous export not found, doing a full History read:[/yellow] '
+                      f'{previous_export}')
+        previous_export = None
+    resumed: dict[str, int] = {}    # profile name -> checkpoint it resumed from
+    if incremental:
+        for unit in units:
+            if unit[0] == 'history':
+                unit[5]['checkpoint'] = True
+    if previous_export:
+        for unit in units:
+            # State files written before keys were resolved hold unresolved ones.
+            entry = state['profiles'].get(state_key(unit[1])) \
+                or state['profiles'].get(str(unit[1]), {})
+            # A checkpoint only resumes an export of the same grain that holds
+            # the profile's History (a --profile run may have written another).
+            checkpoint = entry.get('last_visit_time', 0) \
+                if entry.get('visits', False) == args.history_visits \
+                and entry.get('export', state['export']) == state['export'] else 0
+            if unit[0] == 'history' and checkpoint:
+                unit[5]['since'] = checkpoint
+                resumed[unit[2]] = checkpoint
+        console.print(f'Incremental: resuming History for [bold]{len(resumed)}[/bold] profile(s) '
+                      f'from [underline]{previous_export}[/underline]')
+
+    spill_dir = Path(tempfile.mkdtemp(prefix='tmp_runs_', dir=project_dir)) \
+        if jobs > 1 or len(units) + incremental > MERGE_FAN_IN else None
+    prefetch = start_prefetch(units, args.prefetch) if jobs <= 1 else None
+    counts = [0] * len(units)
+    instrument = args.timings or args.metrics_out
+    # Incremental runs always collect unit counters: History checkpoints come back in them.
+    unit_stats = [new_stats(profile=unit[2], source=unit[0],
+                            **({'checkpoint': 0} if unit[0] == 'history' and incremental else {}))
+                  for unit in units] if instrument or incremental else None
+    stage_stats = {name: new_stats() for name in ('merge', 'round', 'dedupe')}
+    previous_counts = [0]
+    preview: list[Row] = []
+    source_counts: dict[str, int] = {}
+    started_at = datetime.now()
+    try:
+        started = time.perf_counter()
+        runs = open_runs(units, jobs, spill_dir, counts, unit_stats, prefetch)
+        open_seconds = time.perf_counter() - started
+        if incremental:
+            fresh_urls = set()
+            for i, unit in enumerate(units):
+                if unit[0] == 'history' and unit[2] in resumed and not store_path \
+                        and not args.history_visits:
+                    # Deltas are small: materialize them so the previous export
+                    # can drop the rows they supersede. Visits supersede nothing.
+                    delta = list(runs[i])
+                    fresh_urls.update((row.Profile, row.URL) for row in delta)
+                    runs[i] = iter(delta)
+            if previous_export and not store_path:
+                def keep_previous(row: Row) -> bool:
+                    keep = (row.Source == 'History' and row.Profile in resumed
+                            and (row.Profile, row.URL) not in fresh_urls)
+                    previous_counts[0] += keep
+                    return keep
+                runs.append(read_export(previous_export, keep_previous))
+        rows = merge_runs(bounded_runs(runs, spill_dir))
+        if instrument:
+            rows = _timed(rows, stage_stats['merge'])
+        rows = round_dates(rows)
+        if instrument:
+            rows = _timed(rows, stage_stats['round'])
+        if args.history_visits:
+            rows = widen_rows(rows)
+        if args.deduplicate:
+            rows = dedupe_rows(rows, args.dedupe_bits, args.dedupe_normalize,
+                               args.dedupe_memory * 1024 * 1024, project_dir)
+            if instrument:
+                rows = _timed(rows, stage_stats['dedupe'])
+
+        if args.dryrun:
+            total = 0
+            for row in rows:
+                source_counts[row.Source] = source_counts.get(row.Source, 0) + 1
+                total += 1
+        elif store_path:
+            full_output_path = store_path
+            stored = upsert_store(_capture(rows, preview, 20), store_path)
+            total = stored['rows']
+        else:
+            full_output_path = output_path(args, project_dir)
+            total = write_rows(_capture(rows, preview, 20), full_output_path)
+        total_seconds = time.perf_counter() - started
+    finally:
+        if spill_dir and not args.keep_tmp:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+        if prefetch is not None:
+            prefetch.close(args.keep_tmp)
+        if cache is not None:
+            cache.evict()
+
+    for unit, count in zip(units, counts):
+        if count:
+            console.print(f'  [dim]{unit[2]}[/dim] {SOURCE_LABELS[unit[0]]} [cyan]{count}[/cyan]')
+    if previous_counts[0]:
+        console.print(f'  carried over from previous export: [cyan]{previous_counts[0]}[/cyan]')
+
     if args.deduplicate:
-        seen: set[tuple] = set()
-        deduped = []
-        for row in all_rows:
-            key = (row['Profile'], row['Date'], row['URL'])
-            if key not in seen:
-                seen.add(key)
-                deduped.append(row)
-        before = len(all_rows)
-        all_rows = deduped
-        console.print(f'  deduplication removed [cyan]{before - len(all_rows)}[/cyan] rows '
-                      f'({len(all_rows)} remaining)')
+        removed = sum(counts) + previous_counts[0] - total
+        console.print(f'  deduplication removed [cyan]{removed}[/cyan] rows '
+                      f'({total} remaining)')
+
+    if instrument:
+        inclusive = {name: stats['seconds'] for name, stats in stage_stats.items()}
+        if not args.deduplicate:
+            inclusive['dedupe'] = inclusive['round']
+        stages = stage_times(unit_stats, jobs > 1 and len(units) > 1, open_seconds,
+                             inclusive, total_seconds)
+        if args.timings:
+            print_timings(unit_stats, stages)
+        if args.metrics_out:
+            write_metrics(Path(args.metrics_out).expanduser(), unit_stats, stages,
+                          started=started_at.isoformat(timespec='seconds'),
+                          jobs=jobs, dryrun=args.dryrun, rows_written=total)
 
     if args.dryrun:
-        source_counts: dict[str, int] = {}
-        for row in all_rows:
-            source_counts[row['Source']] = source_counts.get(row['Source'], 0) + 1
         breakdown = '  '.join(f'[bold]{s}[/bold]: {n}' for s, n in sorted(source_counts.items()))
+        from rich.panel import Panel
         console.print(Panel(
-            f'[bold cyan]{len(all_rows)}[/bold cyan] total rows across '
+            f'[bold cyan]{total}[/bold cyan] total rows across '
             f'{len(profiles)} profile(s)\n{breakdown}'))
         return
 
-    date_str = datetime.now().strftime('%Y_%m_%d')
-    filename = args.output if args.output else f'{date_str}_ChromeExport.csv'
-    full_output_path = project_dir / filename
-
-    with open(full_output_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(all_rows)
-
-    console.print(
-        f'\n[bold green]Success![/bold green] Exported [bold cyan]{len(all_rows)}[/bold cyan] rows '
-        f'to [underline]{full_output_path}[/underline]')
+    if incremental:
+        export = str(full_output_path.resolve())
+        selected = {key for unit in units if unit[0] == 'history'
+                    for key in (state_key(unit[1]), str(unit[1]))}
+        # Profiles outside this run (--profile) keep their checkpoints, unless
+        # this run rewrote the export file they point to without their rows;
+        # a store keeps every profile's rows.
+        checkpoints = {}
+        for key, entry in state.get('profiles', {}).items():
+            entry_export = entry.get('export', state['export'])
+            if key not in selected and (store_path or entry_export != export):
+                checkpoints[key] = {**entry, 'export': entry_export}
+        for i, unit in enumerate(units):
+            if unit[0] != 'history':
+                continue
+            checkpoint = max(resumed.get(unit[2], 0), unit_stats[i]['checkpoint'])
+            checkpoints[state_key(unit[1])] = {'name': unit[2], 'last_visit_time': checkpoint,
+                                               'visits': args.history_visits, 'export': export}
+        save_state(state_path, {'version': STATE_VERSION, 'export': export,
+                                'profiles': checkpoints})
+
+    if store_path:
+        console.print(
+            f'\n[bold green]Success![/bold green] Stored [bold cyan]{total}[/bold cyan] rows '
+            f'in [underline]{full_output_path}[/underline] ([cyan]{stored["inserted"]}[/cyan] new, '
+            f'[cyan]{stored["updated"]}[/cyan] updated)')
+    else:
+        console.print(
+            f'\n[bold green]Success![/bold green] Exported [bold cyan]{total}[/bold cyan] rows '
+            f'to [underline]{full_output_path}[/underline]')
 
     if args.print:
+        from rich.table import Table
         table = Table(title='Chrome Export Preview', expand=False)
         table.add_column('Profile', style='white', max_width=15, overflow='fold')
         table.add_column('Source', style='blue', max_width=10)
@@ -583,13 +3717,241 @@ def main():
         table.add_column('Title', style='cyan', max_width=28, overflow='fold')
         table.add_column('URL', style='green', max_width=38, overflow='fold')
 
-        for item in all_rows[:20]:
-            table.add_row(item['Profile'], item['Source'], item['Group'],
-                          item['Date'], item['Title'], item['URL'])
+        for item in preview:
+            table.add_row(item.Profile, item.Source, item.Group,
+                          format_minute(item.Date), item.Title, item.URL)
 
         console.print(table)
-        if len(all_rows) > 20:
-            console.print(f'... and {len(all_rows) - 20} more rows.')
+        if total > 20:
+            console.print(f'... and {total - 20} more rows.')
+
+
+# ---------------------------------------------------------------------------
+# Watch mode
+# ---------------------------------------------------------------------------
+
+WATCH_MAX_DELAY = 30.0      # longest a burst of writes may postpone a re-export
+
+# inotify(7) event bits
+_IN_MODIFY, _IN_CLOSE_WRITE, _IN_MOVED_FROM, _IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+_IN_CREATE, _IN_DELETE, _IN_Q_OVERFLOW = 0x100, 0x200, 0x4000
+_INOTIFY_MASK = (_IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+                 | _IN_CREATE | _IN_DELETE)
+_INOTIFY_EVENT = struct.Struct('iIII')     # wd, mask, cookie, name length
+
+
+def watch_paths(units: list[tuple]) -> dict[Path, set[str] | None]:
+    """Directories to watch for `units`, each mapped to the entry names that
+    matter in it (None: any entry, as inside a LevelDB)."""
+    paths: dict[Path, set[str] | None] = {}
+
+    def add(directory: Path, name: str | None = None) -> None:
+        if name is None:
+            paths[directory] = None
+        elif directory not in paths:
+            paths[directory] = {name}
+        elif paths[directory] is not None:
+            paths[directory].add(name)
+
+    for source, profile_dir, *_ in units:
+        if source == 'bookmarks':
+            add(profile_dir, 'Bookmarks')
+        elif source == 'history':
+            for name in ('History', 'History-wal', 'History-journal'):
+                add(profile_dir, name)
+        elif source == 'onetab':
+            for db in onetab_leveldb_dirs(profile_dir):
+                add(profile_dir, db.parent.name)
+                add(db.parent, db.name)
+                add(db)
+    return paths
+
+
+class InotifyWatcher:
+    """Blocks until an entry that matters changes in a watched directory (Linux)."""
+
+    def __init__(self, paths: dict[Path, set[str] | None]):
+        import ctypes
+        import ctypes.util
+        self.paths = paths
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._names: dict[int, set[str] | None] = {}
+        self.add_watches()
+        if not self._names:
+            self.close()
+            raise OSError('none of the source directories could be watched')
+
+    def add_watches(self) -> None:
+        """Watch every directory that exists now; re-adding a watched one is a no-op,
+        so this also picks up directories created since the last call."""
+        for directory, names in self.paths.items():
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _INOTIFY_MASK)
+            if wd >= 0:
+                self._names[wd] = names
+
+    def _relevant(self, buffer: bytes) -> bool:
+        relevant = False
+        pos = 0
+        while pos < len(buffer):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(buffer, pos)
+            pos += _INOTIFY_EVENT.size
+            name = os.fsdecode(buffer[pos:pos + length].rstrip(b'\0'))
+            pos += length
+            names = self._names.get(wd)
+            if mask & _IN_Q_OVERFLOW or names is None or name in names:
+                relevant = True
+        return relevant
+
+    def wait(self) -> None:
+        """Block until a relevant event arrives."""
+        while True:
+            select.select([self._fd], [], [])
+            if self._relevant(os.read(self._fd, 64 * 1024)):
+                return
+
+    def drain(self) -> None:
+        """Discard events already queued."""
+        while select.select([self._fd], [], [], 0)[0]:
+            os.read(self._fd, 64 * 1024)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollWatcher:
+    """Fallback where inotify is unavailable: wakes up every `interval` seconds and
+    leaves change detection to the fingerprints."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    def add_watches(self) -> None:
+        pass
+
+    def wait(self) -> None:
+        time.sleep(self.interval)
+
+    def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(paths: dict[Path, set[str] | None], interval: float):
+    """An inotify watcher on Linux, falling back to polling every `interval` seconds."""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as e:
+            console.print(f'[yellow]inotify unavailable ({e}); polling every {interval:g}s.[/yellow]')
+    return PollWatcher(interval)
+
+
+def wait_for_changes(watcher, units: list[tuple], fingerprints: list,
+                     debounce: float) -> list[int]:
+    """Block until some units' inputs change and settle; return those units' indexes.
+
+    Chrome writes in bursts (a History transaction, a LevelDB compaction), so a
+    change is acted on only once the fingerprints are stable for `debounce`
+    seconds, or after WATCH_MAX_DELAY at the latest.
+    """
+    while True:
+        watcher.wait()
+        current = [source_fingerprint(unit[0], unit[1]) for unit in units]
+        if current == fingerprints:
+            continue
+        deadline = time.monotonic() + WATCH_MAX_DELAY
+        while time.monotonic() < deadline:
+            time.sleep(debounce)
+            settled = [source_fingerprint(unit[0], unit[1]) for unit in units]
+            if settled == current:
+                break
+            current = settled
+        watcher.drain()
+        watcher.add_watches()
+        return [i for i, fingerprint in enumerate(current) if fingerprint != fingerprints[i]]
+
+
+def refresh_units(units: list[tuple], indexes: list[int], runs: list[list[Row]],
+                  fingerprints: list, jobs: int, project_dir: Path, keep_tmp: bool) -> None:
+    """Re-extract `units[i]` for each index into `runs[i]`, recording the
+    fingerprint of its inputs as they were before extraction started."""
+    for i in indexes:
+        fingerprints[i] = source_fingerprint(units[i][0], units[i][1])
+    spill = (jobs > 1 and len(indexes) > 1) or len(indexes) > MERGE_FAN_IN
+    spill_dir = Path(tempfile.mkdtemp(prefix='tmp_runs_', dir=project_dir)) if spill else None
+    try:
+        selected = [units[i] for i in indexes]
+        fresh = open_runs(selected, jobs, spill_dir, [0] * len(selected))
+        for i, run in zip(indexes, fresh):
+            runs[i] = list(run)
+    finally:
+        if spill_dir and not keep_tmp:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def export_rows(runs: list[list[Row]], args: argparse.Namespace,
+                project_dir: Path) -> Iterator[Row]:
+    """Merge, round and (optionally) deduplicate in-memory runs, as `run_export` does."""
+    rows = round_dates(merge_runs([iter(run) for run in runs]))
+    if args.history_visits:
+        rows = widen_rows(rows)
+    if args.deduplicate:
+        rows = dedupe_rows(rows, args.dedupe_bits, args.dedupe_normalize,
+                           args.dedupe_memory * 1024 * 1024, project_dir)
+    return rows
+
+
+def watch_export(args: argparse.Namespace) -> None:
+    """Export once, then re-export whenever a watched source changes.
+
+    Every unit's sorted run stays in memory. A change re-extracts only the
+    units whose `source_fingerprint` moved; the export file is then rewritten
+    from memory, or with `--store` only the re-extracted rows are upserted.
+    """
+    project_dir = Path(args.dir).resolve() if args.dir else Path.cwd()
+    write_rows = OUTPUT_FORMATS[args.format][0]
+    store_path = prepare_output(args)
+    if args.incremental:
+        console.print('[yellow]--watch keeps History in memory; ignoring --incremental.[/yellow]')
+    profiles = resolve_profiles(args, project_dir)
+    if not profiles:
+        return
+    units, cache = plan_units(args, profiles, project_dir)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    runs: list[list[Row]] = [[] for _ in units]
+    fingerprints: list = [None] * len(units)
+    watcher = open_watcher(watch_paths(units), args.watch_interval)
+    changed = list(range(len(units)))
+    try:
+        while True:
+            started = time.perf_counter()
+            refresh_units(units, changed, runs, fingerprints, jobs, project_dir, args.keep_tmp)
+            if store_path:
+                stored = upsert_store(export_rows([runs[i] for i in changed], args, project_dir),
+                                      store_path)
+                summary = (f'stored [cyan]{stored["inserted"]}[/cyan] new, '
+                           f'[cyan]{stored["updated"]}[/cyan] updated rows in '
+                           f'[underline]{store_path}[/underline]')
+            else:
+                path = output_path(args, project_dir)
+                total = write_rows(export_rows(runs, args, project_dir), path)
+                summary = f'exported [bold cyan]{total}[/bold cyan] rows to [underline]{path}[/underline]'
+            if cache is not None:
+                cache.evict()
+            console.print(f'[bold green]{datetime.now():%H:%M:%S}[/bold green] {summary} '
+                          f'({time.perf_counter() - started:.2f}s)')
+            console.print('[dim]Watching for changes (Ctrl-C to stop)...[/dim]')
+            changed = wait_for_changes(watcher, units, fingerprints, args.watch_debounce)
+            console.print('Changed: ' + ', '.join(f'{units[i][2]} {units[i][0]}' for i in changed))
+    except KeyboardInterrupt:
+        console.print('\nStopped watching.')
+    finally:
+        watcher.close()
 
 
 if __name__ == '__main__':
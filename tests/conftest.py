@@ -0,0 +1,69 @@
+"""Shared fixtures: synthetic Chrome data (benchmarks/synthetic.py) and a CLI runner."""
+
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+import onetab_extractor as ote  # noqa: E402
+from synthetic import CHROME_EPOCH_OFFSET_US, make_user_data  # noqa: E402
+
+PROFILES = 3
+
+
+@pytest.fixture(scope='session')
+def user_data_template(tmp_path_factory) -> Path:
+    """A small user-data directory, built once: 3 profiles (IndexedDB and
+    legacy OneTab) x bookmarks, History and OneTab."""
+    root = tmp_path_factory.mktemp('template') / 'User Data'
+    make_user_data(root, profiles=PROFILES, bookmarks=200, history=1500, onetab_tabs=150)
+    return root
+
+
+@pytest.fixture
+def chrome_dir(user_data_template, tmp_path) -> Path:
+    """A private copy of the template that a test may change."""
+    return Path(shutil.copytree(user_data_template, tmp_path / 'User Data'))
+
+
+@pytest.fixture
+def out_dir(tmp_path) -> Path:
+    path = tmp_path / 'out'
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def run_cli(monkeypatch, chrome_dir, out_dir):
+    """Run the CLI against `chrome_dir`, writing into `out_dir`; returns the output path."""
+    def run(output: str, *argv) -> Path:
+        monkeypatch.setattr(sys, 'argv', ['onetab_extractor.py', '-qq',
+                                          '--chrome-dir', str(chrome_dir), '-d', str(out_dir),
+                                          '-o', output, *map(str, argv)])
+        ote.main()
+        return out_dir / output
+    return run
+
+
+def add_visit(profile_dir: Path, url: str, unix_seconds: int) -> None:
+    """Record a new visit to `url` in a profile's History, as Chrome would."""
+    when = unix_seconds * 1_000_000 + CHROME_EPOCH_OFFSET_US
+    conn = sqlite3.connect(profile_dir / 'History')
+    with conn:
+        row = conn.execute('SELECT id FROM urls WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            url_id = conn.execute('INSERT INTO urls (url, title, visit_count, last_visit_time) '
+                                  'VALUES (?, ?, 1, ?)', (url, url, when)).lastrowid
+        else:
+            url_id = row[0]
+            conn.execute('UPDATE urls SET visit_count = visit_count + 1, last_visit_time = ? '
+                         'WHERE id = ?', (when, url_id))
+        conn.execute('INSERT INTO visits (url, visit_time, transition) VALUES (?, ?, 1)',
+                     (url_id, when))
+    conn.close()
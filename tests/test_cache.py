@@ -0,0 +1,50 @@
+"""The extraction cache: hits match a fresh export, corrupt entries are re-extracted."""
+
+import json
+
+import pytest
+
+
+@pytest.fixture
+def cached(run_cli, tmp_path):
+    """Run the CLI with the cache in a private directory; returns (output, cache hits)."""
+    cache_dir = tmp_path / 'cache'
+    metrics = tmp_path / 'metrics.json'
+
+    def run(output: str, *argv) -> tuple[bytes, int]:
+        path = run_cli(output, '--cache', '--cache-dir', cache_dir, '--metrics-out', metrics,
+                       *argv)
+        units = json.loads(metrics.read_text())['units']
+        return path.read_bytes(), sum(unit['cache_hits'] for unit in units)
+    run.directory = cache_dir
+    return run
+
+
+def test_cache_hit_matches_fresh_export(run_cli, cached):
+    fresh = run_cli('fresh.csv', '--no-cache').read_bytes()
+    assert cached('first.csv') == (fresh, 0)
+    output, hits = cached('hit.csv')
+    assert output == fresh
+    assert hits == len(list(cached.directory.glob('*.rows'))) > 0
+
+
+def test_cache_is_off_by_default(run_cli, out_dir):
+    run_cli('plain.csv')
+    assert [path.name for path in out_dir.iterdir()] == ['plain.csv']
+
+
+@pytest.mark.parametrize('damage', ['truncate', 'garble'])
+def test_corrupt_entry_is_extracted_again(run_cli, cached, damage):
+    fresh = run_cli('fresh.csv', '--no-cache').read_bytes()
+    cached('first.csv')
+    entries = list(cached.directory.glob('*.rows'))
+    for path in entries:
+        data = path.read_bytes()
+        if damage == 'truncate':
+            path.write_bytes(data[:len(data) * 2 // 3])
+        else:
+            middle = len(data) // 2
+            path.write_bytes(data[:middle] + bytes(64) + data[middle + 64:])
+    assert cached('again.csv') == (fresh, 0)
+    # The re-extracted entries are whole again and serve the next run.
+    assert cached('hit.csv') == (fresh, len(entries))
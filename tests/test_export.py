@@ -0,0 +1,105 @@
+"""Every way of producing an export agrees with a plain full export."""
+
+import csv
+import sqlite3
+
+import pytest
+
+import onetab_extractor as ote
+from conftest import PROFILES, add_visit
+
+NEW_VISIT = 1_830_297_600       # 2028-01-01, after every synthetic visit
+
+
+def csv_rows(path) -> list[tuple]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return [tuple(row.values()) for row in csv.DictReader(f)]
+
+
+def add_visits(chrome_dir) -> None:
+    add_visit(chrome_dir / 'Default', 'https://new.example/a', NEW_VISIT)
+    add_visit(chrome_dir / 'Profile 1', 'https://new.example/b', NEW_VISIT + 120)
+    add_visit(chrome_dir / 'Profile 2', 'https://site1.example/', NEW_VISIT + 240)
+
+
+@pytest.mark.parametrize('argv', [['-j', '2'], ['-j', '4', '--prefetch', '1'],
+                                  ['--history-access', 'copy']])
+def test_variants_match_full_export(run_cli, argv):
+    full = run_cli('full.csv', '--no-cache').read_bytes()
+    assert run_cli('variant.csv', '--no-cache', *argv).read_bytes() == full
+
+
+def test_cache_hit_matches_full_export(run_cli, tmp_path):
+    full = run_cli('full.csv', '--no-cache').read_bytes()
+    cache_dir = tmp_path / 'cache'
+    run_cli('first.csv', '--cache', '--cache-dir', cache_dir)
+    assert run_cli('hit.csv', '--cache', '--cache-dir', cache_dir, '-j', '2').read_bytes() == full
+
+
+def test_incremental_matches_full_export(run_cli, chrome_dir, out_dir):
+    state = out_dir / 'state.json'
+    first = run_cli('inc.csv', '--no-cache', '--incremental', '--state-file', state)
+    assert first.read_bytes() == run_cli('full.csv', '--no-cache').read_bytes()
+    add_visits(chrome_dir)
+    incremental = csv_rows(run_cli('inc.csv', '--no-cache', '--incremental',
+                                   '--state-file', state))
+    full = csv_rows(run_cli('full.csv', '--no-cache'))
+    # Same rows; ties within one minute may be ordered differently.
+    assert sorted(incremental) == sorted(full)
+    assert [row[-1] for row in incremental[:3]] == [row[-1] for row in full[:3]] == [
+        'https://site1.example/', 'https://new.example/b', 'https://new.example/a']
+
+
+def test_store_matches_full_export(run_cli, chrome_dir, out_dir):
+    store = out_dir / 'store.sqlite'
+    state = out_dir / 'state.json'
+    run_cli('unused.csv', '--no-cache', '--store', store, '--incremental', '--state-file', state)
+    add_visits(chrome_dir)
+    run_cli('unused.csv', '--no-cache', '--store', store, '--incremental', '--state-file', state)
+    full = csv_rows(run_cli('full.csv', '--no-cache'))
+    conn = sqlite3.connect(store)
+    stored = [tuple('' if value is None else value for value in row) for row in conn.execute(
+        f'SELECT Profile, Source, "Group", Date, Color, Title, URL FROM {ote.SQLITE_TABLE}')]
+    conn.close()
+    assert sorted(stored) == sorted(full)
+
+
+@pytest.mark.parametrize('fan_in', [PROFILES * len(ote.SOURCES) - 1, PROFILES * len(ote.SOURCES)])
+def test_fan_in_boundary(run_cli, chrome_dir, out_dir, monkeypatch, fan_in):
+    # One short of the unit count pre-merges; at the unit count only the
+    # previous export's extra run tips an incremental run over.
+    full = run_cli('full.csv', '--no-cache').read_bytes()
+    monkeypatch.setattr(ote, 'MERGE_FAN_IN', fan_in)
+    assert run_cli('bounded.csv', '--no-cache').read_bytes() == full
+    state = out_dir / 'state.json'
+    run_cli('inc.csv', '--no-cache', '--incremental', '--state-file', state)
+    add_visits(chrome_dir)
+    incremental = csv_rows(run_cli('inc.csv', '--no-cache', '--incremental',
+                                   '--state-file', state))
+    monkeypatch.setattr(ote, 'MERGE_FAN_IN', 256)
+    assert sorted(incremental) == sorted(csv_rows(run_cli('full.csv', '--no-cache')))
+
+
+@pytest.mark.parametrize('fmt', ['jsonl', 'sqlite', 'parquet', 'arrow'])
+@pytest.mark.parametrize('visits', [False, True])
+def test_formats_read_back_alike(run_cli, out_dir, fmt, visits):
+    if fmt in ('parquet', 'arrow'):
+        pytest.importorskip('pyarrow')
+    argv = ['--no-cache'] + (['--history-visits'] if visits else [])
+    expected = list(ote.read_export(run_cli('full.csv', *argv), lambda row: True))
+    path = run_cli(f'full.{fmt}', *argv, '--format', fmt)
+    assert list(ote.read_export(path, lambda row: True)) == expected
+
+
+def test_session_matches_cli_and_sees_changes(run_cli, chrome_dir, out_dir, capsys):
+    logged = []
+    with ote.Extractor(chrome_dir, tmp_dir=out_dir / 'tmp', log=logged.append) as session:
+        session.export(ote.file_sink(out_dir / 'session.csv'))
+        assert (out_dir / 'session.csv').read_bytes() == \
+            run_cli('full.csv', '--no-cache').read_bytes()
+        add_visits(chrome_dir)
+        # The pooled History handles are reopened once their files change.
+        session.export(ote.file_sink(out_dir / 'session.csv'))
+        assert (out_dir / 'session.csv').read_bytes() == \
+            run_cli('full.csv', '--no-cache').read_bytes()
+    assert capsys.readouterr().out == ''
@@ -0,0 +1,45 @@
+"""More units than MERGE_FAN_IN: pre-merging runs must not shift them between units."""
+
+import pytest
+
+import onetab_extractor as ote
+from conftest import PROFILES, add_visit
+
+NEW_VISIT = 1_830_297_600       # 2028-01-01, after every synthetic visit
+
+
+@pytest.fixture
+def small_fan_in(monkeypatch):
+    # 3 profiles x 3 sources = 9 units: two levels of early merging.
+    monkeypatch.setattr(ote, 'MERGE_FAN_IN', 2)
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_bounded_merge_matches_full_export(run_cli, monkeypatch, jobs):
+    full = run_cli('full.csv', '--no-cache').read_bytes()
+    monkeypatch.setattr(ote, 'MERGE_FAN_IN', 2)
+    assert run_cli('bounded.csv', '--no-cache', '-j', jobs).read_bytes() == full
+
+
+def test_incremental_with_bounded_merge(small_fan_in, run_cli, chrome_dir, out_dir):
+    state = out_dir / 'state.json'
+    run_cli('inc.csv', '--no-cache', '--incremental', '--state-file', state)
+    add_visit(chrome_dir / 'Profile 1', 'https://fan-in.example/new', NEW_VISIT)
+    add_visit(chrome_dir / 'Profile 2', 'https://site1.example/', NEW_VISIT + 60)
+    incremental = run_cli('inc.csv', '--no-cache', '--incremental', '--state-file', state)
+    full = run_cli('full.csv', '--no-cache')
+    lines = incremental.read_text(encoding='utf-8').splitlines()
+    assert lines[0] == full.read_text(encoding='utf-8').splitlines()[0]
+    assert sorted(lines) == sorted(full.read_text(encoding='utf-8').splitlines())
+    assert [line.rsplit(',', 1)[1] for line in lines[1:3]] == [
+        'https://site1.example/', 'https://fan-in.example/new']
+
+
+def test_refresh_units_keeps_runs_per_unit(small_fan_in, chrome_dir, tmp_path):
+    units = ote.build_units(ote.find_profiles(chrome_dir), list(ote.SOURCES), tmp_path, False)
+    assert len(units) == PROFILES * len(ote.SOURCES)
+    runs = [[] for _ in units]
+    fingerprints = [None] * len(units)
+    ote.refresh_units(units, list(range(len(units))), runs, fingerprints, 1, tmp_path, False)
+    for unit, run in zip(units, runs):
+        assert run == list(ote.sorted_run(unit[0], ote.extract_unit(unit)))
@@ -0,0 +1,41 @@
+"""Incremental exports: --profile runs keep the other profiles' checkpoints."""
+
+import json
+
+from conftest import PROFILES, add_visit
+
+NEW_VISIT = 1_830_297_600       # 2028-01-01, after every synthetic visit
+
+
+def test_profile_run_keeps_other_checkpoints(run_cli, chrome_dir, out_dir):
+    state_path = out_dir / 'state.json'
+    store = out_dir / 'store.sqlite'
+    run_cli('unused.csv', '--no-cache', '--incremental', '--state-file', state_path,
+            '--store', store)
+    before = json.loads(state_path.read_text(encoding='utf-8'))['profiles']
+    assert len(before) == PROFILES
+
+    add_visit(chrome_dir / 'Default', 'https://selected.example/', NEW_VISIT)
+    run_cli('unused.csv', '--no-cache', '--incremental', '--state-file', state_path,
+            '--store', store, '--profile', 'Default')
+    after = json.loads(state_path.read_text(encoding='utf-8'))['profiles']
+    assert after.keys() == before.keys()
+    default = str((chrome_dir / 'Default').resolve())
+    for key, entry in after.items():
+        if key != default:
+            assert entry['last_visit_time'] == before[key]['last_visit_time']
+    assert after[default]['last_visit_time'] > before[default]['last_visit_time']
+
+
+def test_profile_file_export_then_full_run(run_cli, chrome_dir, out_dir):
+    state_path = out_dir / 'state.json'
+    run_cli('inc.csv', '--no-cache', '--incremental', '--state-file', state_path)
+    # Rewrites inc.csv with Default only: the others must be read in full next time.
+    run_cli('inc.csv', '--no-cache', '--incremental', '--state-file', state_path,
+            '--profile', 'Default')
+    assert len(json.loads(state_path.read_text(encoding='utf-8'))['profiles']) == 1
+    add_visit(chrome_dir / 'Profile 1', 'https://later.example/', NEW_VISIT)
+    incremental = run_cli('inc.csv', '--no-cache', '--incremental', '--state-file', state_path)
+    full = run_cli('full.csv', '--no-cache')
+    assert sorted(incremental.read_text(encoding='utf-8').splitlines()) == \
+        sorted(full.read_text(encoding='utf-8').splitlines())